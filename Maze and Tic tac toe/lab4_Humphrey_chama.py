@@ -1,6 +1,24 @@
 import heapq
+import json
+import math
+import mmap
+import os
+import platform
+import random
+import struct
 import sys
-from collections import deque
+import time
+import tracemalloc
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by MazeSolver.distance_field
+    np = None
 
 maze = [
     ["S", ".", ".", "#"],
@@ -9,19 +27,397 @@ maze = [
 ]
 
 
-class MazeSolver:
-    def __init__(self, maze, start, goal):
-        self.maze = maze
-        self.rows = len(maze)
-        self.cols = len(maze[0])
+INFINITY = float("inf")
+# rough per entry costs of the ida* bookkeeping, used for its reported memory ceiling: an int32 key
+# plus an int32 g per transposition table slot, a frame tuple plus a set slot for the path
+TABLE_ENTRY_BYTES = 8
+STACK_FRAME_BYTES = 160
+
+# translation table used to turn a row of maze characters into open (1) / wall (0) bytes
+OPEN_TABLE = bytes(0 if b == ord("#") else 1 for b in range(256))
+# terrain costs: the digits 1-9 are open cells that cost that much to enter, every other open cell
+# costs 1 and walls 0
+WEIGHT_TABLE = bytes(
+    0 if b == ord("#") else b - ord("0") if ord("1") <= b <= ord("9") else 1
+    for b in range(256)
+)
+
+
+# compact grid behind the maze solver. cells live in a flat bytearray (1 = open, 0 = wall) and are
+# addressed by integer ids (row * cols + col). the open neighbours of every cell are computed once
+# into CSR style tables, the neighbours of cell i being neighbors[offsets[i]:offsets[i + 1]].
+# version goes up on every edit made through set_cell. weights is None for uniform cost mazes,
+# otherwise a bytearray with the cost of entering each cell. only MazeSolver.dial uses the weights:
+# the bfs searches find the fewest steps and report them as the cost, and the searches built
+# around unit step costs (a_star, bidirectional_a_star, jps, ida_star, HierarchicalSolver and
+# ReplanningSolver) raise ValueError on a weighted grid rather than return a wrong cost
+class MazeGrid:
+    def __init__(
+        self, rows, cols, cells, offsets=None, neighbors=None, labels=None, weights=None
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.weights = weights
         self.actions = [
             (0, -1),
             (0, 1),
             (-1, 0),
             (1, 0),
         ]  # ["up", "down", "left", "right"]
+        if offsets is None:
+            offsets, neighbors = self.build_adjacency()
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.labels = labels
+        self.version = 0
+        self.stale = False
+
+    # builds a grid from the list of lists (or list of strings) format used by the maze constant,
+    # or from a MappedMaze (see from_mapped)
+    @classmethod
+    def from_maze(cls, maze):
+        if isinstance(maze, MazeGrid):
+            return maze
+        if isinstance(maze, MappedMaze):
+            return cls.from_mapped(maze)
+        rows, cols = len(maze), len(maze[0])
+        text = bytearray().join("".join(row).encode("latin-1") for row in maze)
+        return cls.from_text(rows, cols, text)
+
+    # builds a grid from a MappedMaze one row at a time, translating each row of the mapping
+    # straight into the cells (and weights, if the file has any digit above 1) so the file is never
+    # held in memory as a whole. the grid itself is not a view of the file: its cells take a byte
+    # per cell and the neighbour tables built on first use another 4 to 20 bytes per cell, so a maze
+    # has to fit in memory as a grid to be solved
+    @classmethod
+    def from_mapped(cls, maze):
+        rows, cols, stride, data = maze.rows, maze.cols, maze.stride, maze.data
+        cells = bytearray(rows * cols)
+        weighted = any(data.find(bytes([digit])) != -1 for digit in b"23456789")
+        weights = bytearray(rows * cols) if weighted else None
+        for row in range(rows):
+            text = data[row * stride : row * stride + cols]
+            cells[row * cols : (row + 1) * cols] = text.translate(OPEN_TABLE)
+            if weighted:
+                weights[row * cols : (row + 1) * cols] = text.translate(WEIGHT_TABLE)
+        return cls(rows, cols, cells, weights=weights)
+
+    # builds a grid from the maze characters of all rows back to back. terrain weights are only
+    # kept when the text has a digit above 1, so uniform mazes don't pay for them
+    @classmethod
+    def from_text(cls, rows, cols, text):
+        weights = None
+        if any(digit in text for digit in b"23456789"):
+            weights = text.translate(WEIGHT_TABLE)
+        return cls(rows, cols, text.translate(OPEN_TABLE), weights=weights)
+
+    def cell_id(self, cell):
+        return cell[0] * self.cols + cell[1]
+
+    def cell_of(self, cell_id):
+        return divmod(cell_id, self.cols)
+
+    # precompute the open neighbours of every open cell, in the same order as self.actions
+    def build_adjacency(self):
+        rows, cols, cells = self.rows, self.cols, self.cells
+        offsets = array("i", bytes(4 * (rows * cols + 1)))
+        neighbors = array("i")
+        append = neighbors.append
+        i = 0
+        for row in range(rows):
+            for col in range(cols):
+                if cells[i]:
+                    if col > 0 and cells[i - 1]:
+                        append(i - 1)
+                    if col < cols - 1 and cells[i + 1]:
+                        append(i + 1)
+                    if row > 0 and cells[i - cols]:
+                        append(i - cols)
+                    if row < rows - 1 and cells[i + cols]:
+                        append(i + cols)
+                i += 1
+                offsets[i] = len(neighbors)
+        return offsets, neighbors
+
+    # opens or walls off one cell, an opened cell costing weight (1-9) to enter. the neighbour tables
+    # are only marked stale here and rebuilt by refresh, so a burst of edits costs one rebuild for
+    # the next MazeSolver instead of one per edit
+    def set_cell(self, cell, is_open, weight=1):
+        if not 1 <= weight <= 9:
+            raise ValueError(f"cell weight must be 1-9, got {weight}")
+        cell_id = self.cell_id(cell)
+        self.cells[cell_id] = 1 if is_open else 0
+        if self.weights is None and is_open and weight != 1:
+            self.weights = bytearray(self.cells)
+        if self.weights is not None:
+            self.weights[cell_id] = weight if is_open else 0
+        self.version += 1
+        self.labels = None
+        self.stale = True
+
+    def refresh(self):
+        if self.stale:
+            self.offsets, self.neighbors = self.build_adjacency()
+            self.stale = False
+
+    # connected component label of every cell (-1 for walls), computed by one flood fill pass over
+    # the whole grid the first time it is asked for and kept afterwards
+    def component_labels(self):
+        self.refresh()
+        if self.labels is not None:
+            return self.labels
+        offsets, neighbors, cells = self.offsets, self.neighbors, self.cells
+        labels = array("i", [-1]) * (self.rows * self.cols)
+        label = 0
+        for seed in range(self.rows * self.cols):
+            if not cells[seed] or labels[seed] != -1:
+                continue
+            labels[seed] = label
+            stack = [seed]
+            while stack:
+                current_cell = stack.pop()
+                for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                    child = neighbors[k]
+                    if labels[child] == -1:
+                        labels[child] = label
+                        stack.append(child)
+            label += 1
+        self.labels = labels
+        return labels
+
+    def require_uniform(self, method):
+        if self.weights is not None:
+            raise ValueError(
+                f"{method} ignores terrain weights, use dial on weighted mazes"
+            )
+
+    # true when a path between the two cells can exist, answered from the component labels
+    def connected(self, first, second):
+        first, second = self.cell_id(first), self.cell_id(second)
+        if not self.cells[first] or not self.cells[second]:
+            return False
+        if first == second:
+            return True
+        labels = self.component_labels()
+        return labels[first] != -1 and labels[first] == labels[second]
+
+
+# read only view of a maze text file (the S/./#/G format, one row per line) mapped into memory, so
+# rows can be looked at and S / G found without reading the file. row r is the cols bytes starting
+# at r * stride, stride being the row length plus its line ending, and every row must have the same
+# length (ValueError otherwise). solving still needs a MazeGrid, which MazeGrid.from_maze builds
+# one row at a time: the grid is in memory, only the text of the file stays on disk
+class MappedMaze:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.data)
+        line_end = self.data.find(b"\n")
+        if line_end == -1:
+            self.cols = self.stride = len(self.data)
+        else:
+            self.stride = line_end + 1
+            self.cols = line_end - (self.data[line_end - 1 : line_end] == b"\r")
+        self.rows = (len(self.data) + self.stride - self.cols) // self.stride
+        self.check_rows()
+
+    # every row has to end exactly one stride after the previous one, the last line ending being
+    # optional
+    def check_rows(self):
+        data, cols, stride = self.data, self.cols, self.stride
+        ending = data[cols:stride]
+        sizes = (self.rows * stride, self.rows * stride - len(ending))
+        ragged = any(
+            data[row * stride + cols : (row + 1) * stride] != ending
+            for row in range(self.rows - 1)
+        )
+        if ragged or len(data) not in sizes:
+            self.close()
+            raise ValueError("maze file rows must all have the same length")
+
+    def __len__(self):
+        return self.rows
+
+    # row as a string, for code that indexes the maze like the list of lists format
+    def __getitem__(self, row):
+        return self.row_bytes(row).tobytes().decode("latin-1")
+
+    # zero-copy view of the bytes of one row
+    def row_bytes(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        return self.view[row * self.stride : row * self.stride + self.cols]
+
+    # position of the first occurrence of a marker character, None if the file has none
+    def find(self, marker):
+        position = self.data.find(marker.encode("latin-1"))
+        if position == -1:
+            return None
+        return divmod(position, self.stride)
+
+    @property
+    def start(self):
+        return self.find("S")
+
+    @property
+    def goal(self):
+        return self.find("G")
+
+    def close(self):
+        self.view.release()
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+PACKED_MAGIC = b"MAZEPACK"
+PACKED_HEADER = struct.Struct("<8s6q")
+BIT_TEXT = bytes.maketrans(b"\x00\x01", b"01")
+TEXT_BIT = bytes.maketrans(b"01", b"\x00\x01")
+
+
+# writes a grid in the packed binary format: a header with the shape and the start/goal cells
+# (-1 when unknown) followed by the cells at one bit each. the packing goes through int(text, 2),
+# so it runs at C speed without numpy
+def save_packed(grid, path, start=None, goal=None):
+    if grid.weights is not None:
+        raise ValueError("the packed format can't store terrain weights")
+    start = start or (-1, -1)
+    goal = goal or (-1, -1)
+    size = grid.rows * grid.cols
+    bits = int(bytes(grid.cells).translate(BIT_TEXT) or b"0", 2)
+    with open(path, "wb") as file:
+        file.write(
+            PACKED_HEADER.pack(PACKED_MAGIC, grid.rows, grid.cols, *start, *goal)
+        )
+        file.write(bits.to_bytes((size + 7) // 8, "big"))
+
+
+# reads a file written by save_packed, returns (grid, start, goal)
+def load_packed(path):
+    with open(path, "rb") as file:
+        header = file.read(PACKED_HEADER.size)
+        payload = file.read()
+    magic, rows, cols, start_row, start_col, goal_row, goal_col = PACKED_HEADER.unpack(
+        header
+    )
+    if magic != PACKED_MAGIC:
+        raise ValueError(f"{path} is not a packed maze file")
+    size = rows * cols
+    text = format(int.from_bytes(payload, "big"), f"0{size}b").encode("ascii")
+    cells = bytearray(text.translate(TEXT_BIT))
+    start = (start_row, start_col) if start_row >= 0 else None
+    goal = (goal_row, goal_col) if goal_row >= 0 else None
+    return MazeGrid(rows, cols, cells), start, goal
+
+
+# per query search state sized to the grid: one visited byte and one int32 parent per cell id,
+# about 5 bytes a cell instead of a set and a dict of tuples. a parent of -1 means "no parent".
+# searches that track path costs also get an int32 cost array, -1 meaning "not reached yet"
+class SearchState:
+    def __init__(self, size, costs=False):
+        self.visited = bytearray(size)
+        self.parent = array("i", [-1]) * size
+        self.cost = array("i", [-1]) * size if costs else None
+
+
+# optional instrumentation for MazeSolver.bfs and MazeSolver.a_star: counters for the hot path,
+# wall time per phase (setup, search, path) and on_expand / on_push callbacks taking a cell id.
+# with no stats object the searches only pay a None check per expansion and per push
+class SearchStats:
+    def __init__(self, on_expand=None, on_push=None):
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_skips = 0
+        self.peak_frontier = 0
+        self.timers = {}
+        self.mark = time.perf_counter()
+
+    # starts timing the first phase
+    def begin(self):
+        self.mark = time.perf_counter()
+
+    # adds the time since the last lap (or begin) to a phase
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.timers[phase] = self.timers.get(phase, 0.0) + now - self.mark
+        self.mark = now
+
+    def record_expand(self, cell_id, frontier_size):
+        self.expanded += 1
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if self.on_expand is not None:
+            self.on_expand(cell_id)
+
+    def record_push(self, cell_id):
+        self.pushes += 1
+        if self.on_push is not None:
+            self.on_push(cell_id)
+
+    # plain dict of the counters and timers, ready to be sent to a metrics pipeline
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_skips": self.stale_skips,
+            "peak_frontier": self.peak_frontier,
+            "timers": dict(self.timers),
+        }
+
+
+# outcome of a search: the path as a list of (row, col) cells (None if there is no path), its cost,
+# how many cells were expanded to find it, the SearchStats of the run if it was instrumented and,
+# for the memory bounded search, an estimate of the peak bytes its bookkeeping used (never more
+# than the table cap allows)
+class SearchResult:
+    def __init__(self, path, cost, expanded, stats=None, memory_bound=None):
+        self.path = path
+        self.cost = cost
+        self.expanded = expanded
+        self.stats = stats
+        self.memory_bound = memory_bound
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    def __repr__(self):
+        return f"SearchResult(cost={self.cost}, expanded={self.expanded})"
+
+    # prints the result the way the menu shows it
+    def show(self):
+        if self.found:
+            print(f"Full path: {self.path}")
+            print(f"Cost: {self.cost}")
+            print(f"Nodes expanded: {self.expanded}")
+
+        else:
+            print("Path not found...")
+
+
+class MazeSolver:
+    def __init__(self, maze, start, goal, stats=None, landmarks=None):
+        self.maze = maze
+        self.grid = MazeGrid.from_maze(maze)
+        self.grid.refresh()
+        self.rows = self.grid.rows
+        self.cols = self.grid.cols
+        self.actions = self.grid.actions
         self.start = start
         self.goal = goal
+        self.stats = stats
+        self.landmarks = landmarks
 
     # function to check if a cell is within the confines of the 2D array of the maze. e.g. (-1, 0) is invalid
     def is_cell_valid(self, cell):
@@ -32,138 +428,2252 @@ class MazeSolver:
             return False
         return 0 <= cell_col < cols
 
-    # function that constructs the path after the goal is found
-    def construct_path(self, parent_mappings):
+    # function that constructs the path after the goal is found by walking the int parent array.
+    # end is the cell id the walk starts from and defaults to the goal
+    def construct_path(self, parent, end=None):
         path = []
-        current = self.goal
+        cols = self.grid.cols
+        current = self.grid.cell_id(self.goal) if end is None else end
 
-        while current is not None:
-            path.append(current)
-            current = parent_mappings[current]
+        while current != -1:
+            path.append(divmod(current, cols))
+            current = parent[current]
 
         path.reverse()
         return path
 
-    # generate the frontiers of a node/cell
+    # generate the open neighbours of a node/cell
     def expand_cell(self, cell):
-        if self.maze[cell[0]][cell[1]] == "#":
+        grid = self.grid
+        cell_id = grid.cell_id(cell)
+        if not grid.cells[cell_id]:
             return None
 
-        new_cells = []
+        return [
+            grid.cell_of(grid.neighbors[k])
+            for k in range(grid.offsets[cell_id], grid.offsets[cell_id + 1])
+        ]
+
+    # bfs search to find the path with the fewest steps, terrain weights are ignored
+    def bfs(self):
+        stats = self.stats
+        if stats is not None:
+            stats.begin()
+        grid = self.grid
+        offsets, neighbors = grid.offsets, grid.neighbors
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0, stats)
+        state = SearchState(grid.rows * grid.cols)
+        visited, parent = state.visited, state.parent
+        queue = deque()
+        queue.append(start)
+        visited[start] = 1
+        expanded = 0
+        found_path = start == goal
+        if stats is not None:
+            stats.lap("setup")
+
+        while queue and not found_path:
+            current_cell = queue.popleft()
+            expanded += 1
+            if stats is not None:
+                stats.pops += 1
+                stats.record_expand(current_cell, len(queue) + 1)
+
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if not visited[child]:
+                    visited[child] = 1
+                    parent[child] = current_cell
+                    if child == goal:
+                        found_path = True
+                        break
+                    queue.append(child)
+                    if stats is not None:
+                        stats.record_push(child)
+
+        if stats is not None:
+            stats.lap("search")
+        if found_path:
+            path = self.construct_path(parent)
+            if stats is not None:
+                stats.lap("path")
+            return SearchResult(path, len(path) - 1, expanded, stats)
+        return SearchResult(None, None, expanded, stats)
+
+    def heuristic(self, current):
+        return abs(current[0] - self.goal[0]) + abs(current[1] - self.goal[1])
+
+    # a* search. g holds the best known path cost per cell id (-1 = not reached yet), heap entries are
+    # (f, -g, cell) so that ties on f go to the deeper cell, and entries for cells that were already
+    # closed through a cheaper route are skipped when popped (lazy deletion). with a LandmarkTable
+    # the heuristic is the larger of manhattan distance and the landmark bound
+    def a_star(self):
+        self.grid.require_uniform("a_star")
+        stats = self.stats
+        if stats is not None:
+            stats.begin()
+        grid = self.grid
+        cols, offsets, neighbors = grid.cols, grid.offsets, grid.neighbors
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        goal_row, goal_col = self.goal
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0, stats)
+        state = SearchState(grid.rows * grid.cols, costs=True)
+        closed, came_from, g = state.visited, state.parent, state.cost
+        g[start] = 0
+        landmark_bound = None
+        start_h = self.heuristic(self.start)
+        if self.landmarks is not None:
+            landmark_bound = self.landmarks.bound(goal)
+            start_h = max(start_h, landmark_bound(start))
+        queue = [(start_h, 0, start)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded = 0
+        if stats is not None:
+            stats.lap("setup")
 
-        for i in self.actions:
-            new_cell = (cell[0] + i[0], cell[1] + i[1])
+        while queue:
+            _, neg_g, current_cell = heappop(queue)
 
-            if self.is_cell_valid(new_cell):
-                new_cells.append(new_cell)
+            if closed[current_cell]:
+                if stats is not None:
+                    stats.pops += 1
+                    stats.stale_skips += 1
+                continue
+            closed[current_cell] = 1
+            expanded += 1
+            if stats is not None:
+                stats.pops += 1
+                stats.record_expand(current_cell, len(queue) + 1)
+
+            if current_cell == goal:
+                if stats is not None:
+                    stats.lap("search")
+                path = self.construct_path(came_from)
+                if stats is not None:
+                    stats.lap("path")
+                return SearchResult(path, -neg_g, expanded, stats)
+
+            child_g = 1 - neg_g
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if closed[child]:
+                    continue
+                best = g[child]
+                if best == -1 or child_g < best:
+                    g[child] = child_g
+                    came_from[child] = current_cell
+                    row, col = divmod(child, cols)
+                    h = abs(row - goal_row) + abs(col - goal_col)
+                    if landmark_bound is not None:
+                        h = max(h, landmark_bound(child))
+                    heappush(queue, (child_g + h, -child_g, child))
+                    if stats is not None:
+                        stats.record_push(child)
+
+        if stats is not None:
+            stats.lap("search")
+        return SearchResult(None, None, expanded, stats)
+
+    # dijkstra (or a* with use_heuristic) on weighted terrain, entering a cell costs its weight. the
+    # open list is a dial bucket queue instead of a heap: with the heuristic scaled by the cheapest
+    # weight, a push never lands more than max weight + min weight above the key being popped, so
+    # that many + 1 buckets used round robin hold every open entry and each queue operation is O(1).
+    # stale entries of cells closed through a cheaper route are skipped when their bucket comes up.
+    # uniform mazes run with every weight 1
+    def dial(self, use_heuristic=True):
+        grid = self.grid
+        cols, offsets, neighbors = grid.cols, grid.offsets, grid.neighbors
+        weights = grid.weights
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        goal_row, goal_col = self.goal
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0)
+
+        if weights is None:
+            min_weight = max_weight = 1
+        else:
+            used = [w for w in range(1, 10) if w in weights]
+            min_weight, max_weight = used[0], used[-1]
+        scale = min_weight if use_heuristic else 0
+
+        state = SearchState(grid.rows * grid.cols, costs=True)
+        closed, came_from, g = state.visited, state.parent, state.cost
+        g[start] = 0
+        bucket_count = max_weight + scale + 1
+        buckets = [[] for _ in range(bucket_count)]
+        key = scale * (abs(self.start[0] - goal_row) + abs(self.start[1] - goal_col))
+        buckets[key % bucket_count].append(start)
+        queued = 1
+        expanded = 0
+
+        while queued:
+            bucket = buckets[key % bucket_count]
+            if not bucket:
+                key += 1
+                continue
+            current_cell = bucket.pop()
+            queued -= 1
+            if closed[current_cell]:
+                continue
+            closed[current_cell] = 1
+            expanded += 1
+
+            if current_cell == goal:
+                path = self.construct_path(came_from)
+                return SearchResult(path, g[goal], expanded)
+
+            current_g = g[current_cell]
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if closed[child]:
+                    continue
+                child_g = current_g + (1 if weights is None else weights[child])
+                best = g[child]
+                if best == -1 or child_g < best:
+                    g[child] = child_g
+                    came_from[child] = current_cell
+                    row, col = divmod(child, cols)
+                    child_key = child_g + scale * (
+                        abs(row - goal_row) + abs(col - goal_col)
+                    )
+                    buckets[child_key % bucket_count].append(child)
+                    queued += 1
+
+        return SearchResult(None, None, expanded)
+
+    # open cells of the grid as one python int, bit row * (cols + 1) + col set for every open cell.
+    # the extra column per row is always 0, so a one bit shift never wraps from one row to the next
+    def bitboard(self):
+        grid = self.grid
+        rows, cols, cells = grid.rows, grid.cols, grid.cells
+        text = bytearray().join(
+            bytes(cells[r * cols : (r + 1) * cols]) + b"\x00" for r in range(rows)
+        )
+        return int(text.translate(BIT_TEXT)[::-1] or b"0", 2)
+
+    # bit parallel bfs layers from the start: yields (distance, frontier, unvisited) per layer, the
+    # frontier being the int of the cells first reached at that distance. each layer is four shifts,
+    # an or and an and over the whole board, thousands of cells per bytecode
+    def bitboard_layers(self):
+        width = self.grid.cols + 1
+        unvisited = self.bitboard()
+        frontier = (1 << (self.start[0] * width + self.start[1])) & unvisited
+        unvisited &= ~frontier
+        distance = 0
+        while frontier:
+            yield distance, frontier, unvisited
+            frontier = (
+                (frontier << 1)
+                | (frontier >> 1)
+                | (frontier << width)
+                | (frontier >> width)
+            ) & unvisited
+            unvisited ^= frontier
+            distance += 1
+
+    # bfs on bitboards. only every checkpoint-th layer is kept while searching; the path is read
+    # backwards from the goal, replaying the layers of one checkpoint interval at a time from the
+    # saved frontier, so memory stays at a few boards per checkpoint instead of one per layer
+    def bitboard_bfs(self, checkpoint=64):
+        width = self.grid.cols + 1
+        start_bit = self.start[0] * width + self.start[1]
+        goal_bit = self.goal[0] * width + self.goal[1]
+        if not self.grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0)
+        if start_bit == goal_bit:
+            return SearchResult([self.start], 0, 0)
+        goal_mask = 1 << goal_bit
+
+        checkpoints = []
+        reached = 0
+        distance = -1
+        for distance, frontier, unvisited in self.bitboard_layers():
+            reached += frontier.bit_count()
+            if distance % checkpoint == 0:
+                checkpoints.append((frontier, unvisited))
+            if frontier & goal_mask:
+                break
+        else:
+            return SearchResult(None, None, reached)
+
+        shifts = [d_row * width + d_col for d_row, d_col in self.actions]
+        path = [goal_bit]
+        current = goal_bit
+        layer = distance
+        while layer > 0:
+            # frontiers of the layers from the last checkpoint below the current layer
+            base = (layer - 1) // checkpoint * checkpoint
+            frontier, unvisited = checkpoints[base // checkpoint]
+            frontiers = [frontier]
+            for _ in range(base, layer - 1):
+                frontier = (
+                    (frontier << 1)
+                    | (frontier >> 1)
+                    | (frontier << width)
+                    | (frontier >> width)
+                ) & unvisited
+                unvisited ^= frontier
+                frontiers.append(frontier)
+            while layer > base:
+                previous = frontiers[layer - 1 - base]
+                for shift in shifts:
+                    candidate = current - shift
+                    if candidate >= 0 and (previous >> candidate) & 1:
+                        current = candidate
+                        break
+                path.append(current)
+                layer -= 1
 
-        return new_cells
+        path.reverse()
+        return SearchResult([divmod(bit, width) for bit in path], distance, reached)
+
+    # memory bounded ida*: depth first searches with a growing f threshold, keeping only the current
+    # path plus a transposition table of the smallest g each cell was reached with during the
+    # iteration. a cell reached again with no smaller g is pruned, since its subtree was already
+    # searched within the threshold. the table is a fixed array of slots (the largest power of two
+    # no bigger than table_size, and no bigger than the grid needs) indexed by the low bits of the
+    # cell id, a new entry overwriting whatever held its slot, so with at least as many slots as
+    # cells nothing collides and a smaller table forgets the cells it saw longest ago. the search
+    # slows down gradually while the table holds a good part of the reachable area (a tenth of the
+    # cells of an open 50 x 50 grid still solves in milliseconds); far below that the re-expansions
+    # grow exponentially again, as in plain ida*. paths stay optimal
+    def ida_star(self, table_size=1 << 20):
+        grid = self.grid
+        grid.require_uniform("ida_star")
+        cols, offsets, neighbors = grid.cols, grid.offsets, grid.neighbors
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        goal_row, goal_col = self.goal
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0, memory_bound=0)
+        landmark_bound = None
+        if self.landmarks is not None:
+            landmark_bound = self.landmarks.bound(goal)
+
+        def heuristic(cell_id):
+            row, col = divmod(cell_id, cols)
+            h = abs(row - goal_row) + abs(col - goal_col)
+            if landmark_bound is not None:
+                h = max(h, landmark_bound(cell_id))
+            return h
+
+        slots = 0
+        if table_size >= 1:
+            slots = 1
+            while slots * 2 <= min(table_size, 2 * grid.rows * grid.cols):
+                slots *= 2
+        mask = slots - 1
+        table_memory = slots * TABLE_ENTRY_BYTES
+        threshold = heuristic(start)
+        expanded = 0
+        deepest = 0
+        while True:
+            keys = array("i", [-1]) * slots
+            best_g = array("i", bytes(4 * slots))
+            next_threshold = INFINITY
+            # each frame is (cell, g, index of the next neighbour to try)
+            stack = [(start, 0, offsets[start])]
+            on_path = {start}
+            while stack:
+                current_cell, g, k = stack[-1]
+                if current_cell == goal:
+                    path = [grid.cell_of(frame[0]) for frame in stack]
+                    memory = table_memory + deepest * STACK_FRAME_BYTES
+                    return SearchResult(path, g, expanded, memory_bound=memory)
+                if k == offsets[current_cell]:
+                    expanded += 1
+                if k == offsets[current_cell + 1]:
+                    stack.pop()
+                    on_path.discard(current_cell)
+                    continue
+                stack[-1] = (current_cell, g, k + 1)
+
+                child = neighbors[k]
+                if child in on_path:
+                    continue
+                child_g = g + 1
+                f = child_g + heuristic(child)
+                if f > threshold:
+                    next_threshold = min(next_threshold, f)
+                    continue
+                if slots:
+                    slot = child & mask
+                    if keys[slot] == child and best_g[slot] <= child_g:
+                        continue
+                    keys[slot] = child
+                    best_g[slot] = child_g
+                stack.append((child, child_g, offsets[child]))
+                on_path.add(child)
+                deepest = max(deepest, len(stack))
+
+            if next_threshold == INFINITY:
+                memory = table_memory + deepest * STACK_FRAME_BYTES
+                return SearchResult(None, None, expanded, memory_bound=memory)
+            threshold = next_threshold
+
+    # multi source / multi goal bfs: the queue starts with every start cell and the search stops at
+    # the first goal cell reached, so finding the closest (start, goal) pair costs one search.
+    # starts in no component holding an open goal are dropped up front, like the connected check of
+    # the single pair searches. starts and goals default to the solver's own start and goal
+    def nearest(self, starts=None, goals=None):
+        grid = self.grid
+        offsets, neighbors = grid.offsets, grid.neighbors
+        starts = [self.start] if starts is None else starts
+        goals = [self.goal] if goals is None else goals
+        goal_ids = {grid.cell_id(goal) for goal in goals}
+        labels = grid.component_labels()
+        goal_labels = {labels[goal] for goal in goal_ids} - {-1}
+        state = SearchState(grid.rows * grid.cols)
+        visited, parent = state.visited, state.parent
+        queue = deque()
+        for start in starts:
+            start = grid.cell_id(start)
+            if labels[start] not in goal_labels:
+                continue
+            if start in goal_ids:
+                return SearchResult([grid.cell_of(start)], 0, 0)
+            if not visited[start]:
+                visited[start] = 1
+                queue.append(start)
+        expanded = 0
 
-    # bfs search to find the path
-    def bfs(self):
+        while queue:
+            current_cell = queue.popleft()
+            expanded += 1
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if not visited[child]:
+                    visited[child] = 1
+                    parent[child] = current_cell
+                    if child in goal_ids:
+                        path = self.construct_path(parent, child)
+                        return SearchResult(path, len(path) - 1, expanded)
+                    queue.append(child)
+
+        return SearchResult(None, None, expanded)
+
+    # nearest goal assignment for the whole maze from one bfs seeded with every goal: returns two
+    # int32 arrays indexed by cell id, the index in goals of the closest goal and the distance to it
+    # (both -1 for walls and cells that reach no goal)
+    def nearest_goal_field(self, goals=None):
+        grid = self.grid
+        offsets, neighbors = grid.offsets, grid.neighbors
+        goals = [self.goal] if goals is None else goals
+        owner = array("i", [-1]) * (grid.rows * grid.cols)
+        dist = array("i", [-1]) * (grid.rows * grid.cols)
         queue = deque()
-        queue.append(self.start)
-        visited = set()
-        parent_mappings = {}
-        parent_mappings[self.start] = None
-        found_path = False
+        for index, goal in enumerate(goals):
+            goal = grid.cell_id(goal)
+            if grid.cells[goal] and owner[goal] == -1:
+                owner[goal] = index
+                dist[goal] = 0
+                queue.append(goal)
 
         while queue:
             current_cell = queue.popleft()
+            index, child_dist = owner[current_cell], dist[current_cell] + 1
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if owner[child] == -1:
+                    owner[child] = index
+                    dist[child] = child_dist
+                    queue.append(child)
+
+        return owner, dist
+
+    # joins the start->meet path of the forward search with the meet->goal path of the backward one
+    def join_paths(self, forward_parent, backward_parent, meet):
+        path = self.construct_path(forward_parent, meet)
+        path.extend(self.construct_path(backward_parent, meet)[-2::-1])
+        return path
 
-            if current_cell in visited:
-                continue
-            visited.add(current_cell)
+    # bfs from both ends at once. each round expands a whole layer of the smaller frontier; the first
+    # layer in which a cell already reached by the other side is discovered holds a shortest path, so
+    # the best meeting cell of that layer is kept and the two parent arrays are stitched together
+    def bidirectional_bfs(self):
+        grid = self.grid
+        offsets, neighbors = grid.offsets, grid.neighbors
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0)
+        if start == goal:
+            return SearchResult([self.start], 0, 0)
+
+        size = grid.rows * grid.cols
+        forward = SearchState(size, costs=True)
+        backward = SearchState(size, costs=True)
+        forward.cost[start] = 0
+        backward.cost[goal] = 0
+        forward_frontier, backward_frontier = [start], [goal]
+        expanded = 0
+        best, meet = -1, -1
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                state, other, frontier = forward, backward, forward_frontier
+            else:
+                state, other, frontier = backward, forward, backward_frontier
+            dist, parent, other_dist = state.cost, state.parent, other.cost
+
+            next_frontier = []
+            for current_cell in frontier:
+                expanded += 1
+                child_dist = dist[current_cell] + 1
+                for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                    child = neighbors[k]
+                    if dist[child] == -1:
+                        dist[child] = child_dist
+                        parent[child] = current_cell
+                        next_frontier.append(child)
+                        if other_dist[child] != -1:
+                            total = child_dist + other_dist[child]
+                            if best == -1 or total < best:
+                                best, meet = total, child
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+            if best != -1:
+                path = self.join_paths(forward.parent, backward.parent, meet)
+                return SearchResult(path, best, expanded)
+
+        return SearchResult(None, None, expanded)
+
+    # a* from both ends at once using the average of the two manhattan heuristics as potential, which
+    # keeps both searches consistent. keys are doubled to stay integer: 2g + h_goal - h_start forwards
+    # and 2g + h_start - h_goal backwards. the cheapest meeting cost mu is optimal once the two heap
+    # tops add up to 2 * mu. the side with the smaller open list is expanded next
+    def bidirectional_a_star(self):
+        grid = self.grid
+        grid.require_uniform("bidirectional_a_star")
+        cols, offsets, neighbors = grid.cols, grid.offsets, grid.neighbors
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0)
+        if start == goal:
+            return SearchResult([self.start], 0, 0)
+
+        start_row, start_col = self.start
+        goal_row, goal_col = self.goal
+        size = grid.rows * grid.cols
+        forward = SearchState(size, costs=True)
+        backward = SearchState(size, costs=True)
+        forward.cost[start] = 0
+        backward.cost[goal] = 0
+        distance = abs(start_row - goal_row) + abs(start_col - goal_col)
+        forward_queue = [(distance, 0, start)]
+        backward_queue = [(distance, 0, goal)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded = 0
+        best, meet = -1, -1
 
-            if current_cell == self.goal:
-                found_path = True
+        while True:
+            # drop stale entries so that both tops are real open cells
+            while forward_queue and forward.visited[forward_queue[0][2]]:
+                heappop(forward_queue)
+            while backward_queue and backward.visited[backward_queue[0][2]]:
+                heappop(backward_queue)
+            if not forward_queue or not backward_queue:
+                break
+            if best != -1 and forward_queue[0][0] + backward_queue[0][0] >= 2 * best:
                 break
 
-            children = self.expand_cell(current_cell)
+            if len(forward_queue) <= len(backward_queue):
+                queue, state, other, sign = forward_queue, forward, backward, 1
+            else:
+                queue, state, other, sign = backward_queue, backward, forward, -1
+            g, other_g = state.cost, other.cost
+
+            _, neg_g, current_cell = heappop(queue)
+            state.visited[current_cell] = 1
+            expanded += 1
+
+            child_g = 1 - neg_g
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if state.visited[child]:
+                    continue
+                known = g[child]
+                if known == -1 or child_g < known:
+                    g[child] = child_g
+                    state.parent[child] = current_cell
+                    row, col = divmod(child, cols)
+                    potential = (abs(row - goal_row) + abs(col - goal_col)) - (
+                        abs(row - start_row) + abs(col - start_col)
+                    )
+                    heappush(queue, (2 * child_g + sign * potential, -child_g, child))
+                    if other_g[child] != -1:
+                        total = child_g + other_g[child]
+                        if best == -1 or total < best:
+                            best, meet = total, child
+
+        if best == -1:
+            return SearchResult(None, None, expanded)
+        path = self.join_paths(forward.parent, backward.parent, meet)
+        return SearchResult(path, best, expanded)
+
+    # jump point search for the 4-connected uniform cost grid. instead of pushing every neighbour,
+    # each direction is followed in a straight line until a jump point: the goal, a cell with a forced
+    # neighbour (an opening beside the line that was blocked one step back) or, for vertical moves, a
+    # cell from which a horizontal jump finds one. only jump points go through the a* heap and the
+    # straight segments between them are filled in at the end
+    def jps(self):
+        grid = self.grid
+        grid.require_uniform("jps")
+        rows, cols, cells = grid.rows, grid.cols, grid.cells
+        start, goal = grid.cell_id(self.start), grid.cell_id(self.goal)
+        goal_row, goal_col = self.goal
+        if not grid.connected(self.start, self.goal):
+            return SearchResult(None, None, 0)
+        if start == goal:
+            return SearchResult([self.start], 0, 0)
+
+        def is_open(row, col):
+            return 0 <= row < rows and 0 <= col < cols and cells[row * cols + col]
+
+        # follows (d_row, d_col) from (row, col), returns the jump point id or -1 on a dead end
+        def jump(row, col, d_row, d_col):
+            while is_open(row, col):
+                if row == goal_row and col == goal_col:
+                    return goal
+                if d_col:
+                    if (
+                        is_open(row - 1, col) and not is_open(row - 1, col - d_col)
+                    ) or (is_open(row + 1, col) and not is_open(row + 1, col - d_col)):
+                        return row * cols + col
+                else:
+                    if (
+                        is_open(row, col - 1) and not is_open(row - d_row, col - 1)
+                    ) or (is_open(row, col + 1) and not is_open(row - d_row, col + 1)):
+                        return row * cols + col
+                    if (
+                        jump(row, col + 1, 0, 1) != -1
+                        or jump(row, col - 1, 0, -1) != -1
+                    ):
+                        return row * cols + col
+                row += d_row
+                col += d_col
+            return -1
+
+        state = SearchState(rows * cols, costs=True)
+        closed, came_from, g = state.visited, state.parent, state.cost
+        g[start] = 0
+        queue = [
+            (abs(self.start[0] - goal_row) + abs(self.start[1] - goal_col), 0, start)
+        ]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded = 0
 
-            if children:
-                for child in children:
-                    if child not in visited and self.maze[child[0]][child[1]] != "#":
-                        parent_mappings[child] = current_cell
-                        queue.append(child)
+        while queue:
+            _, neg_g, current_cell = heappop(queue)
+            if closed[current_cell]:
+                continue
+            closed[current_cell] = 1
+            expanded += 1
 
-        if found_path:
-            path = self.construct_path(parent_mappings)
-            print(f"Full path: {path}")
-            print(f"Nodes visited: {len(visited)}")
+            if current_cell == goal:
+                return SearchResult(self.fill_jumps(came_from), -neg_g, expanded)
 
-        else:
-            print("Path not found...")
+            row, col = divmod(current_cell, cols)
+            parent = came_from[current_cell]
+            if parent == -1:
+                directions = self.actions
+            else:
+                parent_row, parent_col = divmod(parent, cols)
+                d_row = (row > parent_row) - (row < parent_row)
+                d_col = (col > parent_col) - (col < parent_col)
+                if d_col:
+                    directions = ((-1, 0), (1, 0), (0, d_col))
+                else:
+                    directions = ((0, -1), (0, 1), (d_row, 0))
+
+            for d_row, d_col in directions:
+                child = jump(row + d_row, col + d_col, d_row, d_col)
+                if child == -1 or closed[child]:
+                    continue
+                child_row, child_col = divmod(child, cols)
+                child_g = -neg_g + abs(child_row - row) + abs(child_col - col)
+                known = g[child]
+                if known == -1 or child_g < known:
+                    g[child] = child_g
+                    came_from[child] = current_cell
+                    f = child_g + abs(child_row - goal_row) + abs(child_col - goal_col)
+                    heappush(queue, (f, -child_g, child))
+
+        return SearchResult(None, None, expanded)
+
+    # distances from the start to every cell as an int32 (rows, cols) numpy array, -1 where the cell
+    # can't be reached. the bfs runs one whole layer at a time: the frontier is a boolean mask that is
+    # shifted once per action and masked with the still unvisited open cells. with directions=True an
+    # int8 array holding the index in self.actions of the move that reached each cell (-1 for the
+    # start and unreached cells) is returned as well, see path_from_directions
+    def distance_field(self, directions=False):
+        if np is None:
+            raise ImportError("distance_field needs numpy")
+        grid = self.grid
+        rows, cols = grid.rows, grid.cols
+        unvisited = np.frombuffer(grid.cells, dtype=np.uint8).reshape(rows, cols) != 0
+        dist = np.full((rows, cols), -1, dtype=np.int32)
+        came_by = np.full((rows, cols), -1, dtype=np.int8) if directions else None
+        frontier = np.zeros((rows, cols), dtype=bool)
+        if unvisited[self.start]:
+            frontier[self.start] = True
+            unvisited[self.start] = False
+            dist[self.start] = 0
+
+        # destination and source windows of the frontier shift for every action
+        shifts = []
+        for d_row, d_col in self.actions:
+            target = (
+                slice(max(d_row, 0), rows + min(d_row, 0)),
+                slice(max(d_col, 0), cols + min(d_col, 0)),
+            )
+            source = (
+                slice(max(-d_row, 0), rows + min(-d_row, 0)),
+                slice(max(-d_col, 0), cols + min(-d_col, 0)),
+            )
+            shifts.append((target, source))
+
+        reached = np.empty_like(frontier)
+        moved = np.empty_like(frontier)
+        layer = 0
+        while frontier.any():
+            layer += 1
+            reached[...] = False
+            for action, (target, source) in enumerate(shifts):
+                moved[...] = False
+                moved[target] = frontier[source]
+                moved &= unvisited
+                if directions:
+                    came_by[moved & ~reached] = action
+                reached |= moved
+            unvisited &= ~reached
+            dist[reached] = layer
+            frontier, reached = reached, frontier
+
+        if directions:
+            return dist, came_by
+        return dist
+
+    # walks the direction array of distance_field back from the goal, returns None if unreachable
+    # (a walled start reaches nothing, itself included)
+    def path_from_directions(self, came_by, goal=None):
+        row, col = self.goal if goal is None else goal
+        if not self.grid.cells[self.grid.cell_id(self.start)]:
+            return None
+        if (row, col) != tuple(self.start) and came_by[row, col] < 0:
+            return None
+        path = [(row, col)]
+        while came_by[row, col] >= 0:
+            d_row, d_col = self.actions[came_by[row, col]]
+            row, col = row - d_row, col - d_col
+            path.append((row, col))
+        path.reverse()
+        return path
 
-    def heuristic(self, current):
-        return abs(current[0] - self.goal[0]) + abs(current[1] - self.goal[1])
+    # expands the chain of jump points ending at the goal into the full cell by cell path
+    def fill_jumps(self, came_from):
+        jump_points = self.construct_path(came_from)
+        path = [jump_points[0]]
+        for row, col in jump_points[1:]:
+            last_row, last_col = path[-1]
+            d_row = (row > last_row) - (row < last_row)
+            d_col = (col > last_col) - (col < last_col)
+            while (last_row, last_col) != (row, col):
+                last_row += d_row
+                last_col += d_col
+                path.append((last_row, last_col))
+        return path
 
-    def g_cost(self, current):
-        return abs(current[0] - self.start[0]) + abs(current[1] - self.start[1])
 
-    def f_cost(self, current):
-        return self.heuristic(current) + self.g_cost(current)
+# landmark (alt) heuristic tables. for a few landmark cells the bfs distance to every cell is stored
+# (-1 when unreachable) and the triangle inequality gives |d(L, goal) - d(L, cell)| <= d(cell, goal)
+# for each landmark L, an admissible bound that sees the walls manhattan distance ignores.
+# landmarks are picked farthest first so they sit at the ends of long corridors. a landmark only
+# helps queries inside its own connected component, so a cell no landmark reaches yet counts as
+# being (size of its component - 1) away, the most any distance in it can be: big components all
+# get landmarks, single cells never do
+class LandmarkTable:
+    def __init__(self, grid, landmarks, distances):
+        self.grid = grid
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, maze, count=8, seed=None):
+        grid = MazeGrid.from_maze(maze)
+        grid.refresh()
+        open_cells = [i for i in range(grid.rows * grid.cols) if grid.cells[i]]
+        if not open_cells:
+            return cls(grid, array("i"), [])
+
+        # each landmark goes to the cell whose distance to the closest landmark so far is the
+        # largest. the first one in a component is the farthest cell from a random cell of it
+        rng = random.Random(seed)
+        labels = grid.component_labels()
+        sizes = {}
+        for i in open_cells:
+            sizes[labels[i]] = sizes.get(labels[i], 0) + 1
+        closest = array("i", bytes(4 * grid.rows * grid.cols))
+        for i in open_cells:
+            closest[i] = sizes[labels[i]] - 1
+        covered = set()
+        landmarks = array("i")
+        distances = []
+        for _ in range(min(count, len(open_cells))):
+            landmark = max(open_cells, key=closest.__getitem__)
+            if closest[landmark] <= 0:
+                break
+            label = labels[landmark]
+            if label not in covered:
+                covered.add(label)
+                component = [i for i in open_cells if labels[i] == label]
+                from_seed = cls.distances_from(grid, rng.choice(component))
+                landmark = max(component, key=from_seed.__getitem__)
+            landmarks.append(landmark)
+            distances.append(cls.distances_from(grid, landmark))
+            for i, value in enumerate(distances[-1]):
+                if value != -1 and value < closest[i]:
+                    closest[i] = value
+        return cls(grid, landmarks, distances)
+
+    # bfs distances from one cell to every cell, -1 where unreachable
+    @staticmethod
+    def distances_from(grid, source):
+        offsets, neighbors = grid.offsets, grid.neighbors
+        dist = array("i", [-1]) * (grid.rows * grid.cols)
+        dist[source] = 0
+        queue = deque([source])
+        while queue:
+            current_cell = queue.popleft()
+            child_dist = dist[current_cell] + 1
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if dist[child] == -1:
+                    dist[child] = child_dist
+                    queue.append(child)
+        return dist
+
+    # heuristic function for one goal cell id, taking a cell id. landmarks that can't reach the goal
+    # are left out up front
+    def bound(self, goal):
+        tables = [(dist, dist[goal]) for dist in self.distances if dist[goal] != -1]
+
+        def heuristic(cell_id):
+            best = 0
+            for dist, to_goal in tables:
+                to_cell = dist[cell_id]
+                if to_cell != -1:
+                    gap = to_goal - to_cell if to_goal > to_cell else to_cell - to_goal
+                    if gap > best:
+                        best = gap
+            return best
+
+        return heuristic
+
+    # raw binary file: a header with the maze shape, landmark count and a checksum of the cells, the
+    # landmark ids and then one int32 distance table per landmark
+    def save(self, path):
+        grid = self.grid
+        with open(path, "wb") as file:
+            file.write(
+                LANDMARK_HEADER.pack(
+                    LANDMARK_MAGIC,
+                    grid.rows,
+                    grid.cols,
+                    len(self.landmarks),
+                    zlib.crc32(grid.cells),
+                )
+            )
+            self.landmarks.tofile(file)
+            for dist in self.distances:
+                dist.tofile(file)
+
+    @classmethod
+    def load(cls, maze, path):
+        grid = MazeGrid.from_maze(maze)
+        with open(path, "rb") as file:
+            magic, rows, cols, count, checksum = LANDMARK_HEADER.unpack(
+                file.read(LANDMARK_HEADER.size)
+            )
+            if magic != LANDMARK_MAGIC:
+                raise ValueError(f"{path} is not a landmark file")
+            if (rows, cols, checksum) != (grid.rows, grid.cols, zlib.crc32(grid.cells)):
+                raise ValueError(f"{path} was built for a different maze")
+            landmarks = array("i")
+            landmarks.fromfile(file, count)
+            distances = []
+            for _ in range(count):
+                dist = array("i")
+                dist.fromfile(file, rows * cols)
+                distances.append(dist)
+        return cls(grid, landmarks, distances)
+
+
+LANDMARK_MAGIC = b"MAZEALT1"
+LANDMARK_HEADER = struct.Struct("<8s4q")
+
+
+# hierarchical pathfinding (hpa*). the grid is cut into cluster_size x cluster_size clusters and every
+# maximal run of open cells along a cluster border gets one entrance (the pair of cells in the middle
+# of the run). the abstract graph links the two cells of an entrance with cost 1 and the entrances of
+# one cluster with their distance inside that cluster. a query connects start and goal to the
+# entrances of their own clusters, searches the small abstract graph and then refines each abstract
+# edge with a bfs limited to one cluster. paths are near optimal, not guaranteed shortest
+class HierarchicalSolver:
+    def __init__(self, maze, cluster_size=16, edges=None):
+        self.grid = MazeGrid.from_maze(maze)
+        self.grid.require_uniform("HierarchicalSolver")
+        self.grid.refresh()
+        self.cluster_size = cluster_size
+        # abstract graph: entrance cell id -> {entrance cell id: cost}
+        self.edges = self.build_abstraction() if edges is None else edges
+        # cluster (row, col) -> the entrance cells inside it
+        self.entrances = {}
+        for node in self.edges:
+            self.entrances.setdefault(self.cluster_of(node), []).append(node)
+
+    def cluster_of(self, cell_id):
+        row, col = divmod(cell_id, self.grid.cols)
+        return row // self.cluster_size, col // self.cluster_size
+
+    # row and column bounds (end exclusive) of the cluster holding a cell
+    def cluster_bounds(self, cell_id):
+        size = self.cluster_size
+        cluster_row, cluster_col = self.cluster_of(cell_id)
+        top, left = cluster_row * size, cluster_col * size
+        return (
+            top,
+            min(top + size, self.grid.rows),
+            left,
+            min(left + size, self.grid.cols),
+        )
 
-    def a_star(self):
-        queue = []
-        queue.append((self.heuristic(self.start), self.start))
-        heapq.heapify(queue)
-        visited = set()
-        came_from = {}
-        came_from[self.start] = None
-        found_path = False
-        cost = 0
+    # bfs from source that never leaves its cluster, returns the distance and parent dicts
+    def cluster_bfs(self, source, target=None):
+        grid = self.grid
+        cols, offsets, neighbors = grid.cols, grid.offsets, grid.neighbors
+        top, bottom, left, right = self.cluster_bounds(source)
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            current_cell = queue.popleft()
+            if current_cell == target:
+                break
+            for k in range(offsets[current_cell], offsets[current_cell + 1]):
+                child = neighbors[k]
+                if child in dist:
+                    continue
+                row, col = divmod(child, cols)
+                if top <= row < bottom and left <= col < right:
+                    dist[child] = dist[current_cell] + 1
+                    parent[child] = current_cell
+                    queue.append(child)
+        return dist, parent
+
+    def add_edge(self, edges, first, second, cost):
+        for a, b in ((first, second), (second, first)):
+            links = edges.setdefault(a, {})
+            if cost < links.get(b, cost + 1):
+                links[b] = cost
+
+    # finds the entrances on every cluster border, then links the entrances inside each cluster
+    def build_abstraction(self):
+        grid = self.grid
+        rows, cols, cells, size = grid.rows, grid.cols, grid.cells, self.cluster_size
+        edges = {}
+
+        # a border is the line between the pairs of cells (first + i * step, first + i * step + jump)
+        borders = []
+        for border_col in range(size, cols, size):
+            for top in range(0, rows, size):
+                first = top * cols + border_col - 1
+                borders.append((first, cols, min(size, rows - top), 1))
+        for border_row in range(size, rows, size):
+            for left in range(0, cols, size):
+                first = (border_row - 1) * cols + left
+                borders.append((first, 1, min(size, cols - left), cols))
+
+        for first, step, length, jump in borders:
+            run = []
+            for i in range(length + 1):
+                cell = first + i * step
+                if i < length and cells[cell] and cells[cell + jump]:
+                    run.append(cell)
+                elif run:
+                    middle = run[len(run) // 2]
+                    self.add_edge(edges, middle, middle + jump, 1)
+                    run = []
+
+        by_cluster = {}
+        for node in edges:
+            by_cluster.setdefault(self.cluster_of(node), []).append(node)
+        for nodes in by_cluster.values():
+            for i, node in enumerate(nodes):
+                dist, _ = self.cluster_bfs(node)
+                for other in nodes[i + 1 :]:
+                    if other in dist:
+                        self.add_edge(edges, node, other, dist[other])
+        return edges
+
+    # writes the abstract graph to disk: a header with the shape, the cluster size, a checksum of the
+    # maze it was built for (so load can refuse a file that belongs to another maze) and the number
+    # of directed edges, then three int32 arrays with the first cell, second cell and cost of each
+    def save(self, path):
+        grid = self.grid
+        firsts, seconds, costs = array("i"), array("i"), array("i")
+        for node, links in self.edges.items():
+            for other, cost in links.items():
+                firsts.append(node)
+                seconds.append(other)
+                costs.append(cost)
+        with open(path, "wb") as file:
+            file.write(
+                HIERARCHY_HEADER.pack(
+                    HIERARCHY_MAGIC,
+                    grid.rows,
+                    grid.cols,
+                    self.cluster_size,
+                    zlib.crc32(grid.cells),
+                    len(costs),
+                )
+            )
+            for table in (firsts, seconds, costs):
+                table.tofile(file)
+
+    @classmethod
+    def load(cls, maze, path):
+        grid = MazeGrid.from_maze(maze)
+        with open(path, "rb") as file:
+            header = file.read(HIERARCHY_HEADER.size)
+            if len(header) != HIERARCHY_HEADER.size:
+                raise ValueError(f"{path} is not a hierarchy file")
+            magic, rows, cols, cluster_size, checksum, count = HIERARCHY_HEADER.unpack(
+                header
+            )
+            if magic != HIERARCHY_MAGIC:
+                raise ValueError(f"{path} is not a hierarchy file")
+            if (rows, cols, checksum) != (grid.rows, grid.cols, zlib.crc32(grid.cells)):
+                raise ValueError(f"{path} was built for a different maze")
+            tables = []
+            for _ in range(3):
+                table = array("i")
+                table.fromfile(file, count)
+                tables.append(table)
+        edges = {}
+        for node, other, cost in zip(*tables):
+            edges.setdefault(node, {})[other] = cost
+        return cls(grid, cluster_size, edges)
+
+    def solve(self, start, goal):
+        grid = self.grid
+        cols = grid.cols
+        start, goal = grid.cell_id(start), grid.cell_id(goal)
+        if not grid.connected(grid.cell_of(start), grid.cell_of(goal)):
+            return SearchResult(None, None, 0)
+        if start == goal:
+            return SearchResult([grid.cell_of(start)], 0, 0)
+
+        # temporary edges from the start and into the goal, found inside their own clusters
+        start_dist, _ = self.cluster_bfs(start)
+        goal_dist, _ = self.cluster_bfs(goal)
+        start_links = {
+            node: start_dist[node]
+            for node in self.entrances.get(self.cluster_of(start), [])
+            if node in start_dist
+        }
+        goal_links = {
+            node: goal_dist[node]
+            for node in self.entrances.get(self.cluster_of(goal), [])
+            if node in goal_dist
+        }
+        if goal in start_dist:
+            start_links[goal] = start_dist[goal]
+        for node, cost in self.edges.get(start, {}).items():
+            start_links[node] = min(cost, start_links.get(node, cost))
+
+        # a* over the abstract graph
+        goal_row, goal_col = divmod(goal, cols)
+        g = {start: 0}
+        came_from = {start: -1}
+        closed = set()
+        queue = [(0, 0, start)]
+        expanded = 0
+        while queue:
+            _, neg_g, current_cell = heapq.heappop(queue)
+            if current_cell in closed:
+                continue
+            closed.add(current_cell)
+            expanded += 1
+            if current_cell == goal:
+                break
+            links = start_links if current_cell == start else self.edges[current_cell]
+            children = list(links.items())
+            if current_cell in goal_links:
+                children.append((goal, goal_links[current_cell]))
+            for child, cost in children:
+                child_g = cost - neg_g
+                if child not in closed and child_g < g.get(child, child_g + 1):
+                    g[child] = child_g
+                    came_from[child] = current_cell
+                    row, col = divmod(child, cols)
+                    f = child_g + abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(queue, (f, -child_g, child))
+        if goal not in closed:
+            return SearchResult(None, None, expanded)
+
+        abstract_path = []
+        current_cell = goal
+        while current_cell != -1:
+            abstract_path.append(current_cell)
+            current_cell = came_from[current_cell]
+        abstract_path.reverse()
+
+        # refine every abstract edge into cells
+        path = [start]
+        for first, second in zip(abstract_path, abstract_path[1:]):
+            if self.cluster_of(first) != self.cluster_of(second):
+                path.append(second)
+                continue
+            _, parent = self.cluster_bfs(first, second)
+            segment = []
+            current_cell = second
+            while current_cell != first:
+                segment.append(current_cell)
+                current_cell = parent[current_cell]
+            path.extend(reversed(segment))
+        return SearchResult([grid.cell_of(c) for c in path], len(path) - 1, expanded)
+
+
+HIERARCHY_MAGIC = b"MAZEHPA1"
+HIERARCHY_HEADER = struct.Struct("<8s5q")
+
+
+# incremental replanning with lifelong planning a* (lpa*). g holds the cost found by the last
+# search and rhs the one step lookahead min(g(neighbour) + 1), both in dicts keyed by cell id so
+# only touched cells take memory. a cell is queued while the two disagree. set_cell changes the
+# maze and re-queues just the edited cell and its neighbours, so the next solve only repairs the
+# part of the previous search tree that the edit invalidated
+class ReplanningSolver:
+    def __init__(self, maze, start, goal):
+        self.grid = MazeGrid.from_maze(maze)
+        self.grid.require_uniform("ReplanningSolver")
+        self.start = start
+        self.goal = goal
+        self.start_id = self.grid.cell_id(start)
+        self.goal_id = self.grid.cell_id(goal)
+        self.g = {}
+        self.rhs = {self.start_id: 0}
+        self.queue = []
+        self.queued = {}  # cell id -> key of its live heap entry
+        self.expanded = 0
+        self.push(self.start_id)
+
+    def heuristic(self, cell_id):
+        row, col = divmod(cell_id, self.grid.cols)
+        return abs(row - self.goal[0]) + abs(col - self.goal[1])
+
+    def key(self, cell_id):
+        best = min(self.g.get(cell_id, INFINITY), self.rhs.get(cell_id, INFINITY))
+        return best + self.heuristic(cell_id), best
+
+    def push(self, cell_id):
+        key = self.key(cell_id)
+        self.queued[cell_id] = key
+        heapq.heappush(self.queue, (key, cell_id))
+
+    # in bounds neighbours of a cell, open or not
+    def around(self, cell_id):
+        grid = self.grid
+        row, col = divmod(cell_id, grid.cols)
+        for d_row, d_col in grid.actions:
+            if 0 <= row + d_row < grid.rows and 0 <= col + d_col < grid.cols:
+                yield cell_id + d_row * grid.cols + d_col
+
+    def update_cell(self, cell_id):
+        cells, g = self.grid.cells, self.g
+        if cell_id != self.start_id:
+            best = INFINITY
+            if cells[cell_id]:
+                for other in self.around(cell_id):
+                    if cells[other]:
+                        best = min(best, g.get(other, INFINITY) + 1)
+            self.rhs[cell_id] = best
+        if g.get(cell_id, INFINITY) != self.rhs.get(cell_id, INFINITY):
+            self.push(cell_id)
+        else:
+            self.queued.pop(cell_id, None)
 
+    def compute_shortest_path(self):
+        queue, queued, g, rhs = self.queue, self.queued, self.g, self.rhs
+        goal = self.goal_id
         while queue:
-            f_cost, current_cell = heapq.heappop(queue)
+            key, cell_id = queue[0]
+            if queued.get(cell_id) != key:
+                heapq.heappop(queue)
+                continue
+            if key >= self.key(goal) and rhs.get(goal, INFINITY) == g.get(
+                goal, INFINITY
+            ):
+                break
+            heapq.heappop(queue)
+            del queued[cell_id]
+            self.expanded += 1
+            if g.get(cell_id, INFINITY) > rhs.get(cell_id, INFINITY):
+                g[cell_id] = rhs[cell_id]
+            else:
+                g[cell_id] = INFINITY
+                self.update_cell(cell_id)
+            for other in self.around(cell_id):
+                self.update_cell(other)
+
+    # opens or walls off a cell. the grid's version goes up and its neighbour tables are marked stale
+    # for other solvers, while this solver only re-queues the cells whose lookahead changed
+    def set_cell(self, cell, is_open):
+        cell_id = self.grid.cell_id(cell)
+        if bool(self.grid.cells[cell_id]) == bool(is_open):
+            return
+        self.grid.set_cell(cell, is_open)
+        self.update_cell(cell_id)
+        for other in self.around(cell_id):
+            self.update_cell(other)
+
+    # repairs the search after any edits and returns the path. expanded counts only the cells
+    # processed by this call
+    def solve(self):
+        self.expanded = 0
+        goal, start = self.goal_id, self.start_id
+        g, cells = self.g, self.grid.cells
+        # the start keeps rhs 0 even when walled off, so a walled start is turned down here
+        if not cells[start]:
+            return SearchResult(None, None, 0)
+        if goal == start:
+            return SearchResult([self.start], 0, 0)
+        self.compute_shortest_path()
+        cost = g.get(goal, INFINITY)
+        if cost == INFINITY:
+            return SearchResult(None, None, self.expanded)
+
+        path = [goal]
+        current_cell = goal
+        while current_cell != start:
+            current_cell = min(
+                (other for other in self.around(current_cell) if cells[other]),
+                key=lambda other: g.get(other, INFINITY),
+            )
+            path.append(current_cell)
+        path.reverse()
+        return SearchResult([self.grid.cell_of(c) for c in path], cost, self.expanded)
+
+
+# size bounded lru cache of search results in front of MazeSolver, keyed by (grid version, start,
+# goal). when the grid is edited through set_cell its version changes and every cached entry is
+# dropped on the next lookup. a miss can still be served from the cache when a cached path runs
+# through both endpoints: the solver methods return shortest paths and any slice of a shortest
+# path is itself a shortest path between its ends. on uniform grids a slice can also be walked
+# backwards; on weighted terrain entering a cell costs its weight, so the way back can cost
+# something else and only forward slices are used, their cost summed from the weights
+class PathCache:
+    def __init__(self, maze, method="a_star", max_size=1024):
+        self.grid = MazeGrid.from_maze(maze)
+        self.method = method
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.positions = {}  # key -> {cell: index of the cell in the cached path}
+        self.through = {}  # cell -> keys of the cached paths that pass through it
+        self.version = self.grid.version
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.positions.clear()
+        self.through.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "subpath_hits": self.subpath_hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "version": self.version,
+        }
+
+    def solve(self, start, goal):
+        start, goal = tuple(start), tuple(goal)
+        if self.grid.version != self.version:
+            self.clear()
+            self.version = self.grid.version
+        key = (self.version, start, goal)
+
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        result = self.cached_slice(start, goal)
+        if result is not None:
+            self.subpath_hits += 1
+        else:
+            self.misses += 1
+            result = getattr(MazeSolver(self.grid, start, goal), self.method)()
+        self.store(key, result)
+        return result
+
+    # looks for a cached path through both cells and cuts the part between them out of it
+    def cached_slice(self, start, goal):
+        keys = self.through.get(start)
+        if not keys:
+            return None
+        for key in keys:
+            positions = self.positions[key]
+            if goal in positions:
+                first, last = positions[start], positions[goal]
+                path = self.entries[key].path
+                if first <= last:
+                    segment = path[first : last + 1]
+                elif self.grid.weights is None:
+                    segment = path[last : first + 1][::-1]
+                else:
+                    continue
+                self.entries.move_to_end(key)
+                return SearchResult(segment, self.path_cost(segment), 0)
+        return None
+
+    def path_cost(self, path):
+        weights = self.grid.weights
+        if weights is None:
+            return len(path) - 1
+        return sum(weights[self.grid.cell_id(cell)] for cell in path[1:])
+
+    def store(self, key, result):
+        self.entries[key] = result
+        if result.found:
+            self.positions[key] = {cell: i for i, cell in enumerate(result.path)}
+            for cell in result.path:
+                self.through.setdefault(cell, set()).add(key)
+        while len(self.entries) > self.max_size:
+            old_key, old_result = self.entries.popitem(last=False)
+            if self.positions.pop(old_key, None) is not None:
+                for cell in old_result.path:
+                    keys = self.through[cell]
+                    keys.discard(old_key)
+                    if not keys:
+                        del self.through[cell]
+
+
+# the grid attached by each worker process of solve_batch, see attach_shared_grid
+worker_grid = None
+worker_memory = None
+
+
+# copies the cells, neighbour tables, component labels and terrain weights of a grid into one shared
+# memory block laid out as [cells | padding | offsets | neighbors | labels | weights], the int arrays
+# starting on a 4 byte boundary
+def share_grid(grid):
+    cell_bytes = (len(grid.cells) + 3) // 4 * 4
+    tables = [grid.offsets, grid.neighbors, grid.component_labels()]
+    weight_bytes = len(grid.weights) if grid.weights is not None else 0
+    memory = shared_memory.SharedMemory(
+        create=True,
+        size=cell_bytes + 4 * sum(len(table) for table in tables) + weight_bytes,
+    )
+    memory.buf[: len(grid.cells)] = grid.cells
+    position = cell_bytes
+    for table in tables:
+        memory.buf[position : position + 4 * len(table)] = table.tobytes()
+        position += 4 * len(table)
+    if weight_bytes:
+        memory.buf[position : position + weight_bytes] = grid.weights
+    layout = (grid.rows, grid.cols, [len(table) for table in tables], weight_bytes > 0)
+    return memory, layout
+
+
+# worker initializer: builds a MazeGrid whose arrays are zero-copy views into the shared block
+def attach_shared_grid(name, layout):
+    global worker_grid, worker_memory
+    rows, cols, table_lengths, weighted = layout
+    worker_memory = shared_memory.SharedMemory(name=name)
+    buffer = worker_memory.buf
+    position = (rows * cols + 3) // 4 * 4
+    tables = []
+    for length in table_lengths:
+        tables.append(buffer[position : position + 4 * length].cast("i"))
+        position += 4 * length
+    weights = buffer[position : position + rows * cols] if weighted else None
+    worker_grid = MazeGrid(rows, cols, buffer[: rows * cols], *tables, weights=weights)
+
+
+def solve_shared_query(method, start, goal):
+    return getattr(MazeSolver(worker_grid, start, goal), method)()
+
+
+# solves many (start, goal) queries against one maze with the given MazeSolver method. the grid and
+# its neighbour tables are built once and put in shared memory, so the worker processes attach to
+# them instead of receiving a pickled copy per task. results come back in query order
+def solve_batch(maze, queries, method="a_star", workers=None, chunksize=16):
+    grid = MazeGrid.from_maze(maze)
+    grid.refresh()
+    queries = list(queries)
+    if workers == 1:
+        return [getattr(MazeSolver(grid, s, g), method)() for s, g in queries]
+
+    memory, layout = share_grid(grid)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=attach_shared_grid,
+            initargs=(memory.name, layout),
+        ) as executor:
+            return list(
+                executor.map(
+                    solve_shared_query,
+                    [method] * len(queries),
+                    [start for start, _ in queries],
+                    [goal for _, goal in queries],
+                    chunksize=chunksize,
+                )
+            )
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+# ========================================= MAZE BENCHMARKS ==========================================
+
+BENCHMARK_METHODS = (
+    "bfs",
+    "a_star",
+    "bidirectional_bfs",
+    "bidirectional_a_star",
+    "jps",
+    "dial",
+    "bitboard_bfs",
+    "ida_star",
+    "nearest",
+    "landmark_a_star",
+    "hierarchical",
+    "replanning",
+)
+BENCHMARK_KINDS = ("perfect", "rooms", "random")
+# methods only benchmarked up to a number of cells: ida* repeats its whole search once per f
+# threshold, which takes seconds at 10**4 cells on a perfect maze and hours at 10**6
+BENCHMARK_MAX_CELLS = {"ida_star": 10**4}
+
+
+# benchmark modes that are not a plain MazeSolver method. each builds what its solver needs for
+# the maze (timed apart, as setup_seconds) and returns the query to time
+def landmark_benchmark(grid, start, goal):
+    table = LandmarkTable.build(grid, seed=0)
+    return lambda: MazeSolver(grid, start, goal, landmarks=table).a_star()
+
+
+def hierarchical_benchmark(grid, start, goal):
+    solver = HierarchicalSolver(grid)
+    return lambda: solver.solve(start, goal)
+
+
+def replanning_benchmark(grid, start, goal):
+    return lambda: ReplanningSolver(grid, start, goal).solve()
+
+
+BENCHMARK_SETUPS = {
+    "landmark_a_star": landmark_benchmark,
+    "hierarchical": hierarchical_benchmark,
+    "replanning": replanning_benchmark,
+}
+
+
+# seeded maze generator, returns (grid, start, goal).
+#   perfect: recursive backtracker maze, exactly one path between any two cells
+#   rooms:   room_size x room_size rooms separated by walls with one door per wall. when the last
+#            row or column is a wall line the goal moves one cell in, into the last room
+#   random:  every cell is a wall with probability density; if that leaves start and goal apart, a
+#            random monotone (right / down) path between them is carved open
+def generate_maze(rows, cols, kind="perfect", density=0.3, room_size=8, seed=None):
+    rng = random.Random(seed)
+    size = rows * cols
+
+    if kind == "random":
+        cells = bytearray(rng.random() >= density for _ in range(size))
+        start, goal = (0, 0), (rows - 1, cols - 1)
+
+    elif kind == "rooms":
+        cells = bytearray(b"\x01") * size
+        for row in range(room_size, rows, room_size + 1):
+            cells[row * cols : (row + 1) * cols] = bytes(cols)
+        for col in range(room_size, cols, room_size + 1):
+            cells[col::cols] = bytes(len(range(col, size, cols)))
+        # one door in every wall segment between two neighbouring rooms
+        for row in range(room_size, rows, room_size + 1):
+            for left in range(0, cols, room_size + 1):
+                width = min(room_size, cols - left)
+                cells[row * cols + left + rng.randrange(width)] = 1
+        for col in range(room_size, cols, room_size + 1):
+            for top in range(0, rows, room_size + 1):
+                height = min(room_size, rows - top)
+                cells[(top + rng.randrange(height)) * cols + col] = 1
+        goal_row, goal_col = rows - 1, cols - 1
+        if goal_row >= room_size and (goal_row - room_size) % (room_size + 1) == 0:
+            goal_row -= 1
+        if goal_col >= room_size and (goal_col - room_size) % (room_size + 1) == 0:
+            goal_col -= 1
+        start, goal = (0, 0), (goal_row, goal_col)
+
+    elif kind == "perfect":
+        # maze cells sit on even coordinates, the cells between them are the walls that get carved
+        cells = bytearray(size)
+        maze_rows, maze_cols = (rows + 1) // 2, (cols + 1) // 2
+        cells[0] = 1
+        stack = [(0, 0)]
+        while stack:
+            row, col = stack[-1]
+            options = [
+                (row + d_row, col + d_col)
+                for d_row, d_col in ((0, -1), (0, 1), (-1, 0), (1, 0))
+                if 0 <= row + d_row < maze_rows
+                and 0 <= col + d_col < maze_cols
+                and not cells[2 * (row + d_row) * cols + 2 * (col + d_col)]
+            ]
+            if not options:
+                stack.pop()
+                continue
+            next_row, next_col = rng.choice(options)
+            cells[(row + next_row) * cols + col + next_col] = 1
+            cells[2 * next_row * cols + 2 * next_col] = 1
+            stack.append((next_row, next_col))
+        start, goal = (0, 0), (2 * (maze_rows - 1), 2 * (maze_cols - 1))
 
-            cost = f_cost + self.g_cost(current_cell)
+    else:
+        raise ValueError(f"unknown maze kind {kind!r}")
+
+    cells[0] = cells[goal[0] * cols + goal[1]] = 1
+    grid = MazeGrid(rows, cols, cells)
+    if kind == "random" and not grid.connected(start, goal):
+        row, col = start
+        while (row, col) != goal:
+            if col == cols - 1 or (row < rows - 1 and rng.random() < 0.5):
+                row += 1
+            else:
+                col += 1
+            cells[row * cols + col] = 1
+        grid = MazeGrid(rows, cols, cells)
+    return grid, start, goal
+
+
+# runs every solver method over generated workloads and writes one json record per run to out:
+# wall time, nodes expanded, path length and, when memory is set, the peak traced allocation of a
+# second run under tracemalloc (kept apart so tracing doesn't inflate the timings). methods in
+# BENCHMARK_MAX_CELLS are skipped on bigger mazes
+def run_benchmarks(
+    sizes=(10**2, 10**4, 10**6),
+    kinds=BENCHMARK_KINDS,
+    methods=BENCHMARK_METHODS,
+    seed=0,
+    memory=True,
+    out=sys.stdout,
+):
+    records = []
+    for size in sizes:
+        side = max(2, math.isqrt(size))
+        for kind in kinds:
+            grid, start, goal = generate_maze(side, side, kind, seed=seed)
+            grid.component_labels()
+            for method in methods:
+                if size > BENCHMARK_MAX_CELLS.get(method, size):
+                    continue
+                setup_seconds = None
+                if method in BENCHMARK_SETUPS:
+                    began = time.perf_counter()
+                    query = BENCHMARK_SETUPS[method](grid, start, goal)
+                    setup_seconds = round(time.perf_counter() - began, 6)
+                else:
+                    query = getattr(MazeSolver(grid, start, goal), method)
+                began = time.perf_counter()
+                result = query()
+                seconds = time.perf_counter() - began
+
+                peak = None
+                if memory:
+                    tracemalloc.start()
+                    query()
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                record = {
+                    "kind": kind,
+                    "rows": side,
+                    "cols": side,
+                    "seed": seed,
+                    "method": method,
+                    "found": result.found,
+                    "path_length": len(result.path) if result.found else None,
+                    "cost": result.cost,
+                    "expanded": result.expanded,
+                    "seconds": round(seconds, 6),
+                    "setup_seconds": setup_seconds,
+                    "peak_bytes": peak,
+                    "python": platform.python_version(),
+                }
+                records.append(record)
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+    return records
 
-            if current_cell in visited:
-                continue
-            visited.add(current_cell)
 
-            if current_cell == self.goal:
-                found_path = True
-                break
+# =======================================================================================================
+#                                             TICTACTOE
+# =======================================================================================================
 
-            children = self.expand_cell(current_cell)
 
-            if children:
-                for child in children:
-                    if child not in visited and self.maze[child[0]][child[1]] != "#":
-                        came_from[child] = current_cell
-                        heapq.heappush(queue, (self.heuristic(child), child))
+# every run of win_length cells on a size x size board as a tuple of cell indices (row * size + col),
+# horizontal, vertical, diagonal down right and diagonal down left
+def board_lines(size, win_length):
+    lines = []
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for row in range(size):
+            for col in range(size):
+                end_row = row + d_row * (win_length - 1)
+                end_col = col + d_col * (win_length - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    lines.append(
+                        tuple(
+                            (row + d_row * i) * size + col + d_col * i
+                            for i in range(win_length)
+                        )
+                    )
+    return lines
+
+
+# win line tables per (size, win length), built once and shared by every board of that shape: the
+# bitmask of every line and, for every cell, the indices of the lines running through it
+LINE_MASKS = {}
+CELL_LINES = {}
+
+# zobrist keys per board size: a random 64 bit key for every (cell, stone) pair, X at 2 * cell and
+# O at 2 * cell + 1. seeded with the size so a position hashes the same in every process
+ZOBRIST_KEYS = {}
+
+
+def zobrist_keys(size):
+    if size not in ZOBRIST_KEYS:
+        rng = random.Random(size)
+        ZOBRIST_KEYS[size] = [rng.getrandbits(64) for _ in range(2 * size * size)]
+    return ZOBRIST_KEYS[size]
+
+
+# tic-tac-toe board as two integer bitboards, bit row * size + col set in x for an X stone and in o
+# for an O stone, plus a cells bytearray (0 empty, 1 X, 2 O) for single cell lookups. since nothing
+# is global any number of boards can be played at once. place and undo only touch the lines through
+# the cell they change (at most 4 * win_length of them) and keep up to date:
+#   - the number of X and O stones in every line, a line reaching win_length being a win
+#   - score, the sum over lines of 10 ** stones for lines only X has stones in, minus the same for
+#     O, so evaluating a position costs nothing
+#   - open_lines[player][count], the lines holding count stones of player and none of the other,
+#     which give the winning cells (count win_length - 1) and the cells that make such a threat
+#     (count win_length - 2) without scanning the board
+#   - hash, the zobrist key of the position, and a running move count that tells when it is full
+class Board:
+    def __init__(self, size, win_length=4):
+        self.size = size
+        self.win_length = win_length
+        self.x = 0
+        self.o = 0
+        self.cells = bytearray(size * size)
+        self.moves = 0
+        self.won = None
+        self.keys = zobrist_keys(size)
+        self.hash = 0
+        # everything but the first / last column, for shifting stones sideways without wrapping
+        self.full = (1 << (size * size)) - 1
+        first_col = sum(1 << (row * size) for row in range(size))
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~(first_col << (size - 1))
+        shape = (size, win_length)
+        if shape not in LINE_MASKS:
+            lines = board_lines(*shape)
+            LINE_MASKS[shape] = [sum(1 << cell for cell in line) for line in lines]
+            CELL_LINES[shape] = [[] for _ in range(size * size)]
+            for i, line in enumerate(lines):
+                for cell in line:
+                    CELL_LINES[shape][cell].append(i)
+        self.lines = LINE_MASKS[shape]
+        self.cell_lines = CELL_LINES[shape]
+        self.x_count = bytearray(len(self.lines))
+        self.o_count = bytearray(len(self.lines))
+        self.line_value = [0] + [10**count for count in range(1, win_length + 1)]
+        self.score = 0
+        self.open_lines = {
+            player: [set() for _ in range(win_length + 1)] for player in "XO"
+        }
+
+    def bit(self, cell):
+        return 1 << (cell[0] * self.size + cell[1])
+
+    def bits(self, player):
+        return self.x if player == "X" else self.o
+
+    def get(self, cell):
+        return ".XO"[self.cells[cell[0] * self.size + cell[1]]]
+
+    def is_empty(self, cell):
+        return not self.cells[cell[0] * self.size + cell[1]]
+
+    def is_full(self):
+        return self.moves == self.size * self.size
+
+    # puts a stone down and returns True if it completes a line
+    def place(self, cell, player):
+        if player == "X":
+            self.x |= self.bit(cell)
+        else:
+            self.o |= self.bit(cell)
+        index = cell[0] * self.size + cell[1]
+        self.cells[index] = 1 if player == "X" else 2
+        self.hash ^= self.keys[2 * index + (player != "X")]
+        self.moves += 1
+        if self.update_lines(index, player, 1):
+            self.won = player
+            return True
+        return False
 
-        if found_path:
-            path = self.construct_path(came_from)
-            print(f"Full path: {path}")
-            print(f"Cost: {cost}")
-            print(f"Nodes visited: {len(visited)}")
+    # takes back the stone at cell, the last move placed there
+    def undo(self, cell):
+        index = cell[0] * self.size + cell[1]
+        stone = self.cells[index]
+        if stone == 1:
+            self.x &= ~(1 << index)
+        else:
+            self.o &= ~(1 << index)
+        self.cells[index] = 0
+        self.hash ^= self.keys[2 * index + stone - 1]
+        self.moves -= 1
+        self.won = None
+        self.update_lines(index, "X" if stone == 1 else "O", -1)
+
+    # adds (change 1) or removes (change -1) a stone of player in every line through cell index,
+    # moving each line between the open_lines sets and fixing up score. returns True if one of the
+    # lines is now full of player's stones
+    def update_lines(self, index, player, change):
+        x_count, o_count, value = self.x_count, self.o_count, self.line_value
+        open_x, open_o = self.open_lines["X"], self.open_lines["O"]
+        score, full = self.score, False
+        for line in self.cell_lines[index]:
+            x, o = x_count[line], o_count[line]
+            if not o:
+                score -= value[x]
+                open_x[x].discard(line)
+            elif not x:
+                score += value[o]
+                open_o[o].discard(line)
+            if player == "X":
+                x += change
+                x_count[line] = x
+            else:
+                o += change
+                o_count[line] = o
+            if not o:
+                score += value[x]
+                if x:
+                    open_x[x].add(line)
+            elif not x:
+                score -= value[o]
+                open_o[o].add(line)
+            if x == self.win_length or o == self.win_length:
+                full = True
+        self.score = score
+        return full
+
+    def winner(self):
+        return self.won
+
+    # empty cells that would complete a line for player: the one empty cell of each line holding
+    # win_length - 1 of player's stones and none of the other player's
+    def threats(self, player):
+        own = self.x if player == "X" else self.o
+        lines, size = self.lines, self.size
+        cells = []
+        for line in self.open_lines[player][self.win_length - 1]:
+            missing = lines[line] & ~own
+            cells.append(divmod(missing.bit_length() - 1, size))
+        return cells
+
+    # empty cells that would give player a line one stone from done, from the open lines holding
+    # win_length - 2 of player's stones
+    def threat_makers(self, player):
+        if self.win_length < 3:
+            return []
+        own = self.x if player == "X" else self.o
+        lines, size = self.lines, self.size
+        bits = 0
+        for line in self.open_lines[player][self.win_length - 2]:
+            bits |= lines[line] & ~own
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(divmod(low.bit_length() - 1, size))
+            bits ^= low
+        return cells
+
+    def winning_move(self, player):
+        threats = self.threats(player)
+        return threats[0] if threats else None
+
+    def empty_cells(self):
+        cells, size = self.cells, self.size
+        return [divmod(i, size) for i in range(size * size) if not cells[i]]
+
+    # empty cells next to a stone (all eight directions), the only moves worth searching on a big
+    # board. the stones are smeared one column each way and then one row each way with shifts
+    def near_cells(self):
+        size, taken = self.size, self.x | self.o
+        if not taken:
+            return [(size // 2, size // 2)]
+        spread = (
+            taken | (taken << 1 & self.not_first_col) | (taken >> 1 & self.not_last_col)
+        )
+        spread |= spread << size | spread >> size
+        free = spread & self.full & ~taken
+        cells = []
+        while free:
+            low = free & -free
+            cells.append(divmod(low.bit_length() - 1, size))
+            free ^= low
+        return cells
+
+    # static score of the position for player: every line still open to one side only is worth
+    # 10 ** stones in it, positive for player and negative for the opponent
+    def evaluate(self, player):
+        return self.score if player == "X" else -self.score
+
+    # the board as a list of lists of "X", "O" and ".", the format print_board expects
+    def rows(self):
+        return [[self.get((r, c)) for c in range(self.size)] for r in range(self.size)]
+
+
+# scores of won and lost positions, well above anything evaluate returns. a win found ply moves
+# down the tree scores WIN_SCORE - ply so quicker wins are preferred
+WIN_SCORE = 10**9
+MATE_SCORE = WIN_SCORE - 1000
+
+# transposition table entry flags: the stored score is exact, a lower bound or an upper bound
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+# negamax search with alpha-beta pruning for the tic-tac-toe agent. iterative deepening runs depth
+# 1, 2, ... until time_ms is used up (or max_depth, if time_ms is None) and plays the best move of
+# the deepest finished iteration.
+# positions go in a transposition table of table_size slots (rounded up to a power of two) indexed
+# by the low bits of the zobrist hash; a slot is replaced when it is empty, holds the same position,
+# was written by an earlier move's search or was searched no deeper than the new entry. moves are
+# ordered table move, two killer moves per ply, cells making a threat for the side to move, cells
+# making one for the opponent, then the rest of the cells next to a stone; a node with a winning
+# cell returns at once and one facing a threat only tries the blocking cells. nodes and seconds of
+# the last move are kept for nodes per second
+class AlphaBetaSearch:
+    def __init__(self, time_ms=500, table_size=1 << 18, max_depth=64):
+        self.time_ms = time_ms
+        self.max_depth = max_depth
+        slots = 1
+        while slots < table_size:
+            slots <<= 1
+        self.mask = slots - 1
+        self.table = [None] * slots
+        self.generation = 0
+        self.killers = []
+        self.nodes = 0
+        self.depth = 0
+        self.seconds = 0.0
+        self.score = 0
+        self.stopped = False
+        self.deadline = 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def show(self):
+        print(
+            f"Searched depth {self.depth}, {self.nodes} nodes in {self.seconds:.3f}s "
+            f"({self.nodes_per_second:,.0f} nodes/s)"
+        )
 
+    # best move for player on board, which is left as it was found
+    def choose(self, board, player):
+        self.generation += 1
+        self.killers = [[None, None] for _ in range(self.max_depth + 1)]
+        self.nodes = 0
+        self.depth = 0
+        self.stopped = False
+        start = time.perf_counter()
+        if self.time_ms is None:
+            self.deadline = math.inf
         else:
-            print("Path not found...")
+            self.deadline = start + self.time_ms / 1000
+        best = board.winning_move(player)
+        if best is not None:
+            self.seconds = time.perf_counter() - start
+            self.score = WIN_SCORE - 1
+            return best
+        empty = board.size * board.size - board.moves
+        for depth in range(1, min(self.max_depth, empty) + 1):
+            score, move = self.root(board, player, depth)
+            if self.stopped:
+                break
+            best, self.score, self.depth = move, score, depth
+            if abs(score) >= MATE_SCORE:
+                break
+        self.seconds = time.perf_counter() - start
+        if best is None:
+            best = self.ordered_moves(board, player, 0, None)[0]
+        return best
+
+    def root(self, board, player, depth):
+        other = "O" if player == "X" else "X"
+        alpha, best = -WIN_SCORE - 1, None
+        key = self.key(board, player)
+        entry = self.table[key & self.mask]
+        table_move = entry[4] if entry is not None and entry[0] == key else None
+        for move in self.ordered_moves(board, player, 0, table_move):
+            if board.place(move, player):
+                score = WIN_SCORE - 1
+            elif board.is_full():
+                score = 0
+            else:
+                score = -self.negamax(
+                    board, other, depth - 1, -WIN_SCORE - 1, -alpha, 1
+                )
+            board.undo(move)
+            if self.stopped:
+                return alpha, best
+            if score > alpha:
+                alpha, best = score, move
+        self.store(board, player, depth, alpha, EXACT, best, 0)
+        return alpha, best
+
+    def negamax(self, board, player, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline:
+            self.stopped = True
+        if self.stopped:
+            return 0
+        key = self.key(board, player)
+        entry = self.table[key & self.mask]
+        table_move = None
+        if entry is not None and entry[0] == key:
+            table_move = entry[4]
+            if entry[1] >= depth:
+                score = self.from_table(entry[2], ply)
+                if entry[3] == EXACT:
+                    return score
+                if entry[3] == LOWER and score >= beta:
+                    return score
+                if entry[3] == UPPER and score <= alpha:
+                    return score
+        if depth == 0:
+            return board.evaluate(player)
+        if board.winning_move(player) is not None:
+            return WIN_SCORE - ply - 1
+        if board.is_full():
+            return 0
+        other = "O" if player == "X" else "X"
+        original_alpha, best, best_move = alpha, -WIN_SCORE - 1, None
+        for move in self.ordered_moves(board, player, ply, table_move):
+            if board.place(move, player):
+                score = WIN_SCORE - ply - 1
+            elif board.is_full():
+                score = 0
+            else:
+                score = -self.negamax(board, other, depth - 1, -beta, -alpha, ply + 1)
+            board.undo(move)
+            if self.stopped:
+                return 0
+            if score > best:
+                best, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if move != killers[0]:
+                    killers[0], killers[1] = move, killers[0]
+                break
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(board, player, depth, best, flag, best_move, ply)
+        return best
+
+    # moves for player in search order, for a position where player has no winning move. if the
+    # opponent has a line one stone from done only the blocking cells are worth trying
+    def ordered_moves(self, board, player, ply, table_move):
+        other = "O" if player == "X" else "X"
+        blocks = board.threats(other)
+        if blocks:
+            return list(dict.fromkeys(blocks))
+        first = [table_move] + self.killers[ply]
+        moves = [move for move in first if move is not None and board.is_empty(move)]
+        moves += board.threat_makers(player) + board.threat_makers(other)
+        moves = list(dict.fromkeys(moves))
+        seen = set(moves)
+        moves += [move for move in board.near_cells() if move not in seen]
+        return moves
+
+    # the same stones with the other side to move are a different position, O to move is the
+    # complement of the zobrist hash
+    def key(self, board, player):
+        return board.hash if player == "X" else ~board.hash
+
+    # win scores are stored relative to the node, not the root, so they stay right when the same
+    # position turns up at another ply
+    def store(self, board, player, depth, score, flag, move, ply):
+        if score >= MATE_SCORE:
+            score += ply
+        elif score <= -MATE_SCORE:
+            score -= ply
+        key = self.key(board, player)
+        slot = key & self.mask
+        entry = self.table[slot]
+        if (
+            entry is None
+            or entry[0] == key
+            or entry[5] != self.generation
+            or entry[1] <= depth
+        ):
+            self.table[slot] = (key, depth, score, flag, move, self.generation)
+
+    def from_table(self, score, ply):
+        if score >= MATE_SCORE:
+            return score - ply
+        if score <= -MATE_SCORE:
+            return score + ply
+        return score
+
+
+# node of a monte carlo search tree: move is the cell player played to get here, untried the moves
+# from here not expanded yet. a done node is a finished game, winner None meaning a draw
+class TreeNode:
+    def __init__(self, move, parent, player, untried):
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.untried = untried
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+        self.done = False
+        self.winner = None
+
+    # uct value seen from the parent, wins counted for the player who made the move
+    def uct(self, exploration):
+        return self.wins / self.visits + exploration * math.sqrt(
+            math.log(self.parent.visits) / self.visits
+        )
 
 
-# =======================================================================================================
-#                                             TICTACTOE
-# =======================================================================================================
-import random
+# moves worth expanding for player to move: a winning cell if there is one, the blocking cells if
+# the opponent has a threat, otherwise the cells next to a stone
+def tree_moves(board, player):
+    wins = board.threats(player)
+    if wins:
+        return wins[:1]
+    blocks = board.threats("O" if player == "X" else "X")
+    if blocks:
+        return list(dict.fromkeys(blocks))
+    return board.near_cells()
+
+
+# plays random moves from the position to the end of the game on copies of the two bitboards and
+# returns the winner (None for a draw). the empty cells are shuffled once, so every move is a pop,
+# and a move wins if one of the line masks through its cell is now all set
+def random_playout(board, player, rng):
+    x, o = board.x, board.o
+    lines, cell_lines, cells = board.lines, board.cell_lines, board.cells
+    empty = [i for i in range(len(cells)) if not cells[i]]
+    rng.shuffle(empty)
+    for index in empty:
+        if player == "X":
+            x |= 1 << index
+            own = x
+        else:
+            o |= 1 << index
+            own = o
+        for line in cell_lines[index]:
+            if own & lines[line] == lines[line]:
+                return player
+        player = "O" if player == "X" else "X"
+    return None
+
+
+# one uct search from the position on board (left as it was found), stopped after playouts
+# iterations or time_ms milliseconds, whichever comes first. returns the visits and wins of every
+# root move and the number of playouts run
+def run_mcts(board, player, playouts, time_ms, exploration, rng):
+    root = TreeNode(
+        None, None, "O" if player == "X" else "X", tree_moves(board, player)
+    )
+    rng.shuffle(root.untried)
+    deadline = time.perf_counter() + time_ms / 1000 if time_ms is not None else None
+    count = 0
+    while playouts is None or count < playouts:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        node, path = root, []
+        while not node.done and not node.untried and node.children:
+            node = max(node.children, key=lambda child: child.uct(exploration))
+            board.place(node.move, node.player)
+            path.append(node.move)
+        if not node.done and node.untried:
+            move = node.untried.pop()
+            to_move = "O" if node.player == "X" else "X"
+            won = board.place(move, to_move)
+            path.append(move)
+            child = TreeNode(move, node, to_move, [])
+            if won or board.is_full():
+                child.done, child.winner = True, to_move if won else None
+            else:
+                child.untried = tree_moves(board, "O" if to_move == "X" else "X")
+                rng.shuffle(child.untried)
+            node.children.append(child)
+            node = child
+        if node.done:
+            winner = node.winner
+        else:
+            winner = random_playout(board, "O" if node.player == "X" else "X", rng)
+        for move in reversed(path):
+            board.undo(move)
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1
+            elif winner is None:
+                node.wins += 0.5
+            node = node.parent
+        count += 1
+    return {child.move: (child.visits, child.wins) for child in root.children}, count
+
+
+# worker process side of MonteCarloSearch: rebuilds the board from its cells and runs one tree
+def mcts_worker(size, win_length, cells, player, playouts, time_ms, exploration, seed):
+    board = Board(size, win_length)
+    for index, stone in enumerate(cells):
+        if stone:
+            board.place(divmod(index, size), "X" if stone == 1 else "O")
+    return run_mcts(board, player, playouts, time_ms, exploration, random.Random(seed))
+
+
+# monte carlo tree search agent (uct with random playouts) for boards too big for alpha-beta to see
+# far. with several workers the search is root parallel: each process of a pool grows its own tree
+# from the same position with its own seed and the visit counts of the root moves are summed, the
+# most visited move being played. the budget is playouts in total (split between the workers) or,
+# if playouts is None, time_ms milliseconds. the pool is kept between moves, close() shuts it down
+class MonteCarloSearch:
+    def __init__(
+        self, playouts=None, time_ms=500, workers=1, exploration=1.4, seed=None
+    ):
+        self.playouts = playouts
+        self.time_ms = time_ms
+        self.workers = workers or os.cpu_count()
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.executor = None
+        self.count = 0
+        self.seconds = 0.0
+
+    @property
+    def playouts_per_second(self):
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def show(self):
+        print(
+            f"Ran {self.count} playouts on {self.workers} workers in {self.seconds:.3f}s "
+            f"({self.playouts_per_second:,.0f} playouts/s)"
+        )
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    # best move for player on board, which is left as it was found
+    def choose(self, board, player):
+        start = time.perf_counter()
+        self.count = 0
+        move = board.winning_move(player)
+        if move is None:
+            move = self.search(board, player)
+        self.seconds = time.perf_counter() - start
+        return move
+
+    def search(self, board, player):
+        playouts = self.playouts
+        if playouts is not None:
+            playouts = -(-playouts // self.workers)
+        time_ms = self.time_ms if self.playouts is None else None
+        seeds = [self.rng.getrandbits(64) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [
+                run_mcts(
+                    board,
+                    player,
+                    playouts,
+                    time_ms,
+                    self.exploration,
+                    random.Random(seeds[0]),
+                )
+            ]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [
+                self.executor.submit(
+                    mcts_worker,
+                    board.size,
+                    board.win_length,
+                    bytes(board.cells),
+                    player,
+                    playouts,
+                    time_ms,
+                    self.exploration,
+                    seed,
+                )
+                for seed in seeds
+            ]
+            results = [future.result() for future in futures]
+        visits = {}
+        for moves, count in results:
+            self.count += count
+            for move, (move_visits, _) in moves.items():
+                visits[move] = visits.get(move, 0) + move_visits
+        if not visits:
+            return tree_moves(board, player)[0]
+        return max(visits, key=visits.get)
 
-board = 0
-iterator = 0
 
+# set up by play_tic_tac_toe, so importing the module allocates no transposition table
+board = None
+agent_search = None
 
-def make_board(n):
+
+def make_board(n, k=4):
     global board
-    board = [["." for _ in range(n)] for _ in range(n)]
+    board = Board(n, k)
     return
 
 
 current_player = "X"
 output = False  # this will be used to check if the game has come to an end
-best_move = 0  # thi variable will be temporarily tracking the best move
-lock = False  # this lock exists so that the Agent priotizes winning over blocking X
 
 
 # this will be switching the two players
@@ -178,492 +2688,57 @@ def switch():
 # self explanortory
 def is_cell_valid(cell):
     cell_row, cell_col = cell[0], cell[1]
-    rows, cols = len(board), len(board[0])
 
-    if not (0 <= cell_row < rows):
+    if not (0 <= cell_row < board.size):
         return False
-    return 0 <= cell_col < cols
+    return 0 <= cell_col < board.size
 
 
-# checks for a winner as well as the best move that the agent can make horizontally
-def checkHorizontal():
-    global output, current_player, best_move, lock, iterator
-    i = 0  # row start index
-    for list in board:
-        j = 0  # column start index
-        if len(board) == 5:
-            iterator = 2
-        else:
-            iterator = 5
-        while j < iterator:
-            # checks if we have a winner
-            if list[j] == list[j + 1] == list[j + 2] == list[j + 3] and list[j] != ".":
-                output = True
-                switch()
-                return best_move
-            # checks if the current player is the agent and the decides what best move it can make
-            elif current_player == "O":
-                if (
-                    list[j] == list[j + 1] == list[j + 2] == "O"
-                    and is_cell_valid((i, j - 1))
-                    and board[i][j - 1] == "."
-                ):
-                    # when it finds the move that can make it win, it locks the lock so that other check algorithms don't waste time running as well as so that they dont outer the best move
-                    lock = True
-                    output = True
-                    return (i, j - 1)
-                elif (
-                    list[j] == list[j + 1] == list[j + 2] == "X"
-                    and is_cell_valid((i, j - 1))
-                    and board[i][j - 1] == "."
-                ):
-                    return (i, j - 1)
-                elif (
-                    list[j] == list[j + 1] == list[j + 2] == "O"
-                    and is_cell_valid((i, j + 3))
-                    and board[i][j + 3] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i, j + 3)
-                elif (
-                    list[j] == list[j + 1] == list[j + 2] == "X"
-                    and is_cell_valid((i, j + 3))
-                    and board[i][j + 3] == "."
-                ):
-                    return (i, j + 3)
-                elif (
-                    list[j] == list[j + 1] == list[j + 3] == "O"
-                    and board[i][j + 2] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i, j + 2)
-                elif (
-                    list[j] == list[j + 1] == list[j + 3] == "X"
-                    and board[i][j + 2] == "."
-                ):
-                    return (i, j + 2)
-                elif (
-                    list[j] == list[j + 2] == list[j + 3] == "O"
-                    and board[i][j + 1] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i, j + 1)
-                elif (
-                    list[j] == list[j + 2] == list[j + 3] == "X"
-                    and board[i][j + 1] == "."
-                ):
-                    return (i, j + 1)
-                elif j == 4:
-                    if (
-                        list[j + 1] == list[j + 2] == list[j + 3] == "O"
-                        and list[j] == "."
-                    ):
-                        lock = True
-                        output = True
-                        return (i, j)
-                    elif (
-                        list[j + 1] == list[j + 2] == list[j + 3] == "X"
-                        and list[j] == "."
-                    ):
-                        return (i, j)
-
-            j = j + 1
-        i = i + 1
-    return best_move
-
-
-# checks for a winner as well as the best move that the agent can make horizontally
-def checkVertical():
-    global board, best_move, output, lock, iterator
-    j = 0  # column start index
-    if len(board) == 5:
-        iterator = 2
-    else:
-        iterator = 5
-    while j < len(board):  # Checks if we haven't reached the last column
-        i = 0
-        while i < iterator:
-            # this line checks if we have a winner, useful to both the human and the agent
-            if (
-                board[i][j] == board[i + 1][j] == board[i + 2][j] == board[i + 3][j]
-                and board[i][j] != "."
-            ):
-                output = True
-                switch()
-                return best_move
-            # this line checks if the current player is the Agent, and then decides the best move it can make
-            elif current_player == "O":
-                # This checks if the best move has alread been found in the horizontal check
-                if lock:
-                    return best_move
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 2][j] == "O"
-                    and is_cell_valid((i - 1, j))
-                    and board[i - 1][j] == "."
-                ):
-                    # when it finds the move that can make it win, it locks the lock so that other check algorithms don't waste time running as well as so that they dont outer the best move
-                    lock = True
-                    output = True
-                    return (i - 1, j)
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 2][j] == "X"
-                    and is_cell_valid((i - 1, j))
-                    and board[i - 1][j] == "."
-                ):
-                    return (i - 1, j)
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 2][j] == "O"
-                    and is_cell_valid((i + 3, j))
-                    and board[i + 3][j] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i + 3, j)
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 2][j] == "X"
-                    and is_cell_valid((i + 3, j))
-                    and board[i + 3][j] == "."
-                ):
-                    return (i + 3, j)
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 3][j] == "O"
-                    and board[i + 2][j] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i + 2, j)
-                elif (
-                    board[i][j] == board[i + 1][j] == board[i + 3][j] == "X"
-                    and board[i + 2][j] == "."
-                ):
-                    return (i + 2, j)
-                elif (
-                    board[i][j] == board[i + 2][j] == board[i + 3][j] == "O"
-                    and board[i + 1][j] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i + 1, j)
-                elif (
-                    board[i][j] == board[i + 2][j] == board[i + 3][j] == "X"
-                    and board[i + 1][j] == "."
-                ):
-                    return (i + 1, j)
-                elif i == 4:
-                    if (
-                        board[i + 1][j] == board[i + 2][j] == board[i + 3][j] == "O"
-                        and board[i][j] == "."
-                    ):
-                        lock = True
-                        output = True
-                        return (i, j)
-                    elif (
-                        board[i + 1][j] == board[i + 2][j] == board[i + 3][j] == "X"
-                        and board[i][j] == "."
-                    ):
-                        return (i, j)
-            i = i + 1
-        j = j + 1
-    return best_move
-
-
-# checks for a winner as well as the best move that the agent can make Diagonally
-def checkDiagonalRight():
-    global board, best_move, output, lock
-    # Magic, can be explained better in person
-    i = 4
-    j = -1
-    n = 0
-    m = 0
-    while n <= len(board):
-        temp_i = i
-        temp_j = j
-        m = m + 1
-        q = 1
-        while q <= m:
-            i = i - 1
-            j = j + 1
-            if (
-                board[i][j]
-                == board[i - 1][j + 1]
-                == board[i - 2][j + 2]
-                == board[i - 3][j + 3]
-                and board[i][j] != "."
-            ):
-                output = True
-                switch()
-                return best_move
-            # this line checks if the current player is the Agent, and then decides the best move it can make
-            elif current_player == "O":
-                # This checks if the best move has alread been found in the horizontal or vertical check
-                if lock:
-                    return best_move
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 2][j + 2] == "O"
-                    and is_cell_valid((i + 1, j - 1))
-                    and board[i + 1][j - 1] == "."
-                ):
-                    # when it finds the move that can make it win, it locks the lock so that other check algorithms don't waste time running as well as so that they dont outer the best move
-                    lock = True
-                    output = True
-                    return (i + 1, j - 1)
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 2][j + 2] == "X"
-                    and is_cell_valid((i + 1, j - 1))
-                    and board[i + 1][j - 1] == "."
-                ):
-                    return (i + 1, j - 1)
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 2][j + 2] == "O"
-                    and is_cell_valid((i - 3, j + 3))
-                    and board[i - 3][j + 3] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 3, j + 3)
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 2][j + 2] == "X"
-                    and is_cell_valid((i - 3, j + 3))
-                    and board[i - 3][j + 3] == "."
-                ):
-                    return (i - 3, j + 3)
-                elif (
-                    board[i][j] == board[i - 2][j + 2] == board[i - 3][j + 3] == "O"
-                    and board[i - 1][j + 1] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 1, j + 1)
-                elif (
-                    board[i][j] == board[i - 2][j + 2] == board[i - 3][j + 3] == "X"
-                    and board[i - 1][j + 1] == "."
-                ):
-                    return (i - 1, j + 1)
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 3][j + 3] == "O"
-                    and board[i - 2][j + 2] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 2, j + 2)
-                elif (
-                    board[i][j] == board[i - 1][j + 1] == board[i - 3][j + 3] == "X"
-                    and board[i - 2][j + 2] == "."
-                ):
-                    return (i - 2, j + 2)
-                elif m == q:
-                    if (
-                        board[i - 1][j + 1]
-                        == board[i - 2][j + 2]
-                        == board[i - 3][j + 3]
-                        == "O"
-                        and board[i][j] == "."
-                    ):
-                        lock = True
-                        output = True
-                        return (i, j)
-                    elif (
-                        board[i - 1][j + 1]
-                        == board[i - 2][j + 2]
-                        == board[i - 3][j + 3]
-                        == "X"
-                        and board[i][j] == "."
-                    ):
-                        return (i, j)
-            q = q + 1
-        i = temp_i + 1
-        j = temp_j
-        n = n + 1
-        if n >= (len(board) - 3):
-            j = (len(board) - 3) - m
-            m = m - 2
-            i = len(board)
-    return best_move
-
-
-# checks for a winner as well as the best move that the agent can make Diagonally
-def checkDiagonalLeft():
-    # Magic, can be explained better in person
-    global output, best_move, lock, iterator, board
-    j = 4
-    i = len(board)
-    n = 0
-    m = 0
-    while n <= len(board):
-        temp_i = i
-        temp_j = j
-        m = m + 1
-        q = 1
-        while q <= m:
-            j = j - 1
-            i = i - 1
-            if (
-                board[i][j]
-                == board[i - 1][j - 1]
-                == board[i - 2][j - 2]
-                == board[i - 3][j - 3]
-                and board[i][j] != "."
-            ):
-                output = True
-                switch()
-                return
-            # this line checks if the current player is the Agent, and then decides the best move it can make
-            elif current_player == "O":
-                if lock:
-                    return best_move
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 2][j - 2] == "O"
-                    and is_cell_valid((i + 1, j + 1))
-                    and board[i + 1][j + 1] == "."
-                ):
-                    # when it finds the move that can make it win, it locks the lock so that other check algorithms don't waste time running as well as so that they dont outer the best move
-                    lock = True
-                    output = True
-                    return (i + 1, j + 1)
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 2][j - 2] == "X"
-                    and is_cell_valid((i + 1, j + 1))
-                    and board[i + 1][j + 1] == "."
-                ):
-                    return (i + 1, j + 1)
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 2][j - 2] == "O"
-                    and is_cell_valid((i - 3, j - 3))
-                    and board[i - 3][j - 3] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 3, j - 3)
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 2][j - 2] == "X"
-                    and is_cell_valid((i - 3, j - 3))
-                    and board[i - 3][j - 3] == "."
-                ):
-                    return (i - 3, j - 3)
-                elif (
-                    board[i][j] == board[i - 2][j - 2] == board[i - 3][j - 3] == "O"
-                    and board[i - 1][j - 1] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 1, j - 1)
-                elif (
-                    board[i][j] == board[i - 2][j - 2] == board[i - 3][j - 3] == "X"
-                    and board[i - 1][j - 1] == "."
-                ):
-                    return (i - 1, j - 1)
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 3][j - 3] == "O"
-                    and board[i - 2][j - 2] == "."
-                ):
-                    lock = True
-                    output = True
-                    return (i - 2, j - 2)
-                elif (
-                    board[i][j] == board[i - 1][j - 1] == board[i - 3][j - 3] == "X"
-                    and board[i - 2][j - 2] == "."
-                ):
-                    return (i - 2, j - 2)
-                elif m == q:
-                    if (
-                        board[i - 1][j - 1]
-                        == board[i - 2][j - 2]
-                        == board[i - 3][j - 3]
-                        == "O"
-                        and board[i][j] == "."
-                    ):
-                        lock = True
-                        output = True
-                        return (i, j)
-                    elif (
-                        board[i - 1][j - 1]
-                        == board[i - 2][j - 2]
-                        == board[i - 3][j - 3]
-                        == "X"
-                        and board[i][j] == "."
-                    ):
-                        return (i, j)
-            q = q + 1
-        j = temp_j + 1
-        i = temp_i
-        n = n + 1
-        if n >= (len(board) - 3):
-            i = m + 2
-            m = m - 2
-            j = 0
-    return best_move
+# reads a cell typed either as two digits (e.g. 11) or as row and column separated by a space
+# (e.g. 12 7), which bigger boards need
+def read_cell(prompt):
+    while True:
+        text = input(prompt).split()
+        if len(text) == 1 and len(text[0]) == 2:
+            text = list(text[0])
+        if len(text) == 2 and text[0].isdigit() and text[1].isdigit():
+            return int(text[0]), int(text[1])
+        prompt = "pleas enter row and colunm number e.g. 11 or 12 7: "
 
 
 def human():
-    global board, current_player
-    if type(check()) != bool:
-        row, column = tuple(input("Enter row and column number e.g. 11: "))
-        while True:
-            row, column = int(row), int(column)
-            cell = (row, column)
-            if is_cell_valid(cell):
-                if board[row][column] == ".":
-                    board[row][column] = "X"
-                    switch()
-                    return
-                else:
-                    row, column = tuple(
-                        input("pleas enter valid row and colunm number!! ")
-                    )
+    cell = read_cell("Enter row and column number e.g. 11: ")
+    while True:
+        if is_cell_valid(cell):
+            if board.is_empty(cell):
+                board.place(cell, "X")
+                return
             else:
-                row, column = tuple(
-                    input("pleas enter an existing row and colunm number!! ")
-                )
-    return
+                cell = read_cell("pleas enter valid row and colunm number!! ")
+        else:
+            cell = read_cell("pleas enter an existing row and colunm number!! ")
 
 
+# ends the game once either player has a full line, the board records it as moves are placed
 def check():
-    global best_move, lock
-    if not output:
-        best_move = checkHorizontal()
-        best_move = checkVertical()
-        best_move = checkDiagonalLeft()
-        best_move = checkDiagonalRight()
-        lock = False
-        return best_move
+    global output
+    if board.winner() is not None:
+        output = True
     return output
 
 
 def check_full():
     global output
-    count = 0
-    for _ in board:
-        for i in _:
-            if i != ".":
-                count = count + 1
-
-    if count == 64:
+    if board.is_full():
         output = True
+    return output
 
 
+# the agent plays the move found by agent_search (alpha-beta or monte carlo) within its budget
 def agent():
-    global best_move
-    move = check()
-    if type(move) != bool:
-        if move == 0:
-            while True:
-                if len(board) == 8:
-                    x = random.randint(0, 7)
-                    y = random.randint(0, 7)
-                else:
-                    x = random.randint(0, 4)
-                    y = random.randint(0, 4)
-                if board[x][y] == ".":
-                    board[x][y] = "O"
-                    return
-        else:
-            board[move[0]][move[1]] = "O"
-            best_move = 0
-            return
-    return
+    move = agent_search.choose(board, "O")
+    board.place(move, "O")
+    agent_search.show()
 
 
 # print the board
@@ -677,26 +2752,256 @@ def print_board(board):
 
 
 def play_tic_tac_toe():
-    global output, current_player
-    board_size = int(input("Enter board size between 5 or 8: "))
-    if board_size == 5:
-        make_board(5)
-    elif board_size == 8:
-        make_board(8)
-    while not output:
-        current_player = "X"
-        print_board(board)
-        human()
-        agent()
-        check_full()
+    global output, current_player, agent_search
+    board_size = int(input("Enter board size e.g. 5, 8 or 19: "))
+    win_length = input("How many in a row to win (default 4): ")
+    make_board(board_size, int(win_length) if win_length.strip() else 4)
+    search = input("Agent search, 1 alpha-beta or 2 monte carlo (default 1): ")
+    if search.strip() == "2":
+        agent_search = MonteCarloSearch(workers=None)
+    else:
+        agent_search = AlphaBetaSearch()
+    output = False
+    current_player = "X"
+    try:
+        while not output:
+            print_board(board.rows())
+            human()
+            if check() or check_full():
+                break
+            switch()
+            agent()
+            if check() or check_full():
+                break
+            switch()
+    finally:
+        if isinstance(agent_search, MonteCarloSearch):
+            agent_search.close()
 
     print("----------------------------------------------")
-    print("We have a winner!!>>>>|", current_player, "|<<<<<<<")
+    if board.winner() is not None:
+        print("We have a winner!!>>>>|", current_player, "|<<<<<<<")
+    else:
+        print("It's a draw!!")
     print("----------------------------------------------")
-    print_board(board)
+    print_board(board.rows())
+
+
+# ======================================= TIC-TAC-TOE SELF PLAY ======================================
+
+SELF_PLAY_AGENTS = ("random", "alphabeta", "mcts")
+
+
+# headless tic-tac-toe game for engines and self play: no input(), no printing and no globals, so
+# any number of games can run side by side. play puts a stone for the player to move and returns
+# the winner, over being set once someone has won or the board is full (winner None for a draw)
+class Game:
+    def __init__(self, size, win_length=4):
+        self.board = Board(size, win_length)
+        self.to_move = "X"
+        self.over = False
+        self.winner = None
+        self.history = []
+
+    def legal_moves(self):
+        return [] if self.over else self.board.empty_cells()
+
+    def play(self, cell):
+        if self.over:
+            raise ValueError("the game is over")
+        row, col = cell
+        size = self.board.size
+        if not (0 <= row < size and 0 <= col < size) or not self.board.is_empty(cell):
+            raise ValueError(f"{cell} is not a legal move")
+        self.history.append(cell)
+        if self.board.place(cell, self.to_move):
+            self.over, self.winner = True, self.to_move
+        elif self.board.is_full():
+            self.over = True
+        self.to_move = "O" if self.to_move == "X" else "X"
+        return self.winner
+
+    def undo(self):
+        self.board.undo(self.history.pop())
+        self.over, self.winner = False, None
+        self.to_move = "O" if self.to_move == "X" else "X"
+
+
+# plays a random empty cell, the baseline opponent for self play
+class RandomAgent:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self, board, player):
+        return self.rng.choice(board.empty_cells())
+
+
+# self play agents by name. the searches get fixed budgets (depth for alpha-beta, playouts for
+# monte carlo) instead of time limits so the same seed always plays the same games
+def make_agent(name, seed, depth=2, playouts=200):
+    if name == "random":
+        return RandomAgent(seed)
+    if name == "alphabeta":
+        return AlphaBetaSearch(time_ms=None, table_size=1 << 12, max_depth=depth)
+    if name == "mcts":
+        return MonteCarloSearch(playouts=playouts, seed=seed)
+    raise ValueError(f"unknown agent {name!r}")
+
+
+# plays one game between two agents and returns the winner, appending the seconds every move
+# took to latencies
+def play_game(game, x_agent, o_agent, latencies):
+    agents = {"X": x_agent, "O": o_agent}
+    while not game.over:
+        start = time.perf_counter()
+        move = agents[game.to_move].choose(game.board, game.to_move)
+        latencies.append(time.perf_counter() - start)
+        game.play(move)
+    return game.winner
+
+
+# move latencies are counted in a histogram of log scale buckets, LATENCY_STEPS per decade from 1
+# microsecond up to 100 seconds, so the histograms of any number of workers just add up and take
+# the same few hundred bytes whatever the run length. bucket i holds the latencies from
+# 10 ** (i / LATENCY_STEPS) up to 10 ** ((i + 1) / LATENCY_STEPS) microseconds, the first and last
+# buckets also everything below and above
+LATENCY_STEPS = 20
+LATENCY_BUCKETS = 8 * LATENCY_STEPS
+
+
+def latency_bucket(seconds):
+    if seconds <= 1e-6:
+        return 0
+    return min(LATENCY_BUCKETS - 1, int(math.log10(seconds * 1e6) * LATENCY_STEPS))
+
+
+# the q-th quantile of a latency histogram in milliseconds, as the upper edge of the bucket it
+# falls in (at most 10 ** (1 / LATENCY_STEPS), about 12%, above the exact value)
+def latency_percentile(histogram, q):
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = min(total - 1, int(q * total))
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if seen > rank:
+            return round(10 ** ((bucket + 1) / LATENCY_STEPS) / 1000, 4)
+
+
+# plays games first .. first + count - 1 of a self play run. game i gets its own rng seeded from
+# (seed, i), so its moves don't depend on how the run is split between workers. returns the X
+# wins, O wins and draws, the number of moves and the histogram of move latencies
+def self_play_chunk(
+    first, count, size, win_length, x_name, o_name, seed, depth, playouts
+):
+    wins = {"X": 0, "O": 0, None: 0}
+    histogram = array("q", bytes(8 * LATENCY_BUCKETS))
+    moves = 0
+    for index in range(first, first + count):
+        rng = random.Random(f"{seed}/{index}")
+        x_agent = make_agent(x_name, rng.getrandbits(64), depth, playouts)
+        o_agent = make_agent(o_name, rng.getrandbits(64), depth, playouts)
+        latencies = []
+        wins[play_game(Game(size, win_length), x_agent, o_agent, latencies)] += 1
+        moves += len(latencies)
+        for latency in latencies:
+            histogram[latency_bucket(latency)] += 1
+    return wins["X"], wins["O"], wins[None], moves, histogram
+
+
+# plays games agent-vs-agent games (x_agent moving first) in a pool of worker processes and
+# writes one json record to out: win and draw rates, move latency percentiles in milliseconds
+# (from the summed latency histograms) and games per second. workers=1 plays in this process
+def run_self_play(
+    games=1000,
+    size=5,
+    win_length=4,
+    x_agent="alphabeta",
+    o_agent="random",
+    workers=None,
+    seed=0,
+    depth=2,
+    playouts=200,
+    chunksize=None,
+    out=sys.stdout,
+):
+    for name in (x_agent, o_agent):
+        if name not in SELF_PLAY_AGENTS:
+            raise ValueError(f"unknown agent {name!r}")
+    if chunksize is None:
+        chunksize = max(1, min(1000, games // (4 * (workers or os.cpu_count()))))
+    firsts = list(range(0, games, chunksize))
+    counts = [min(chunksize, games - first) for first in firsts]
+    tasks = [
+        (first, count, size, win_length, x_agent, o_agent, seed, depth, playouts)
+        for first, count in zip(firsts, counts)
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [self_play_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self_play_chunk, *zip(*tasks)))
+    seconds = time.perf_counter() - start
+
+    x_wins = sum(result[0] for result in results)
+    o_wins = sum(result[1] for result in results)
+    draws = sum(result[2] for result in results)
+    moves = sum(result[3] for result in results)
+    histogram = array("q", bytes(8 * LATENCY_BUCKETS))
+    for result in results:
+        for bucket, count in enumerate(result[4]):
+            histogram[bucket] += count
+
+    record = {
+        "games": games,
+        "size": size,
+        "win_length": win_length,
+        "x_agent": x_agent,
+        "o_agent": o_agent,
+        "seed": seed,
+        "x_win_rate": x_wins / games if games else 0.0,
+        "o_win_rate": o_wins / games if games else 0.0,
+        "draw_rate": draws / games if games else 0.0,
+        "moves": moves,
+        "latency_ms_p50": latency_percentile(histogram, 0.5),
+        "latency_ms_p90": latency_percentile(histogram, 0.9),
+        "latency_ms_p99": latency_percentile(histogram, 0.99),
+        "seconds": round(seconds, 6),
+        "games_per_second": round(games / seconds, 2) if seconds else None,
+        "python": platform.python_version(),
+    }
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+    return record
 
 
 if __name__ == "__main__":
+    # "python lab4_Humphrey_chama.py bench [max cells] [--no-memory]" runs the maze benchmarks and
+    # exits. peak memory is measured unless --no-memory is given, which halves the run time
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        arguments = [a for a in sys.argv[2:] if a != "--no-memory"]
+        max_cells = int(arguments[0]) if arguments else 10**6
+        run_benchmarks(
+            sizes=[10**k for k in range(2, 8) if 10**k <= max_cells],
+            memory="--no-memory" not in sys.argv,
+        )
+        sys.exit()
+
+    # "python lab4_Humphrey_chama.py selfplay [games] [size] [win length] [x agent] [o agent]"
+    # plays agent against agent headless and prints the results as json
+    if len(sys.argv) > 1 and sys.argv[1] == "selfplay":
+        arguments = sys.argv[2:]
+        run_self_play(
+            games=int(arguments[0]) if len(arguments) > 0 else 1000,
+            size=int(arguments[1]) if len(arguments) > 1 else 5,
+            win_length=int(arguments[2]) if len(arguments) > 2 else 4,
+            x_agent=arguments[3] if len(arguments) > 3 else "alphabeta",
+            o_agent=arguments[4] if len(arguments) > 4 else "random",
+        )
+        sys.exit()
+
     while True:
         print("What game would you like to play:")
         print(
@@ -718,11 +3023,11 @@ if __name__ == "__main__":
             case 1:
                 print_board(maze)
                 maze_solver = MazeSolver(maze, (0, 0), (2, 3))
-                maze_solver.bfs()
+                maze_solver.bfs().show()
             case 2:
                 print_board(maze)
                 maze_solver = MazeSolver(maze, (0, 0), (2, 3))
-                maze_solver.a_star()
+                maze_solver.a_star().show()
             case 3:
                 play_tic_tac_toe()
             case 4:
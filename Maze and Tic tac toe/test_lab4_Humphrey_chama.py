@@ -0,0 +1,464 @@
+import io
+import random
+
+import pytest
+
+import lab4_Humphrey_chama as lab
+
+
+# a 50 x 50 random maze with a table of 512 slots, a fifth of the cells: the cap binds but the
+# pruning keeps the search from blowing up
+def test_ida_star_with_a_binding_table_cap():
+    grid, start, goal = lab.generate_maze(50, 50, "random", density=0.25, seed=2)
+    expected = lab.MazeSolver(grid, start, goal).bfs()
+    full = lab.MazeSolver(grid, start, goal).ida_star()
+    capped = lab.MazeSolver(grid, start, goal).ida_star(table_size=512)
+    assert full.cost == capped.cost == expected.cost
+    assert capped.expanded < 10 * full.expanded
+    assert capped.memory_bound < full.memory_bound
+
+
+# entering a cell costs its weight, so on ".9." the two directions cost different amounts and a
+# cached path can only be sliced forwards
+def test_path_cache_slices_weighted_paths_forwards_only():
+    cache = lab.PathCache([list(".9.")], method="dial")
+    assert cache.solve((0, 0), (0, 2)).cost == 10
+    assert cache.solve((0, 2), (0, 1)).cost == 9
+    assert cache.solve((0, 0), (0, 1)).cost == 9
+    assert cache.subpath_hits == 1
+
+
+def test_unit_cost_searches_refuse_weighted_grids():
+    solver = lab.MazeSolver([list(".9.")], (0, 0), (0, 2))
+    for method in ("a_star", "bidirectional_a_star", "jps", "ida_star"):
+        with pytest.raises(ValueError):
+            getattr(solver, method)()
+    with pytest.raises(ValueError):
+        lab.HierarchicalSolver([list(".9.")])
+    with pytest.raises(ValueError):
+        lab.ReplanningSolver([list(".9.")], (0, 0), (0, 2))
+
+
+def test_mapped_maze_builds_the_same_grid(tmp_path):
+    path = tmp_path / "maze.txt"
+    path.write_bytes(b"S.#3\r\n#..#\r\n..9G\r\n")
+    with lab.MappedMaze(str(path)) as mapped:
+        grid = lab.MazeGrid.from_maze(mapped)
+        assert (mapped.start, mapped.goal) == ((0, 0), (2, 3))
+    expected = lab.MazeGrid.from_maze(["S.#3", "#..#", "..9G"])
+    assert grid.cells == expected.cells
+    assert grid.weights == expected.weights
+
+
+def test_mapped_maze_rejects_ragged_rows(tmp_path):
+    path = tmp_path / "maze.txt"
+    path.write_bytes(b"S..\n#.\n..G\n")
+    with pytest.raises(ValueError):
+        lab.MappedMaze(str(path))
+
+
+def test_random_mazes_connect_start_and_goal():
+    for seed in range(20):
+        grid, start, goal = lab.generate_maze(31, 31, "random", seed=seed)
+        assert grid.connected(start, goal)
+        assert lab.MazeSolver(grid, start, goal).bfs().found
+
+
+# 9 and 27 put the last row and column on a wall line
+def test_room_mazes_connect_start_and_goal():
+    for rows, cols in ((9, 9), (27, 27), (9, 20), (20, 27), (30, 31), (1, 5)):
+        for seed in range(3):
+            grid, start, goal = lab.generate_maze(rows, cols, "rooms", seed=seed)
+            assert grid.connected(start, goal)
+
+
+def test_hierarchy_round_trips_through_its_file(tmp_path):
+    grid, start, goal = lab.generate_maze(40, 40, "rooms", seed=1)
+    solver = lab.HierarchicalSolver(grid, cluster_size=8)
+    solver.save(tmp_path / "maze.hpa")
+    loaded = lab.HierarchicalSolver.load(grid, tmp_path / "maze.hpa")
+    assert loaded.edges == solver.edges
+    assert loaded.solve(start, goal).cost == solver.solve(start, goal).cost
+    (tmp_path / "other.hpa").write_bytes(b"not a hierarchy")
+    with pytest.raises(ValueError):
+        lab.HierarchicalSolver.load(grid, tmp_path / "other.hpa")
+
+
+def test_latency_histogram_percentiles():
+    histogram = [0] * lab.LATENCY_BUCKETS
+    for latency in [0.001] * 90 + [0.1] * 10:
+        histogram[lab.latency_bucket(latency)] += 1
+    assert 1 <= lab.latency_percentile(histogram, 0.5) <= 1.13
+    assert 100 <= lab.latency_percentile(histogram, 0.99) <= 113
+    assert lab.latency_percentile([0] * lab.LATENCY_BUCKETS, 0.5) is None
+
+
+def test_self_play_does_not_depend_on_the_worker_split():
+    runs = [
+        lab.run_self_play(
+            60,
+            4,
+            3,
+            "random",
+            "mcts",
+            workers=workers,
+            playouts=20,
+            chunksize=chunksize,
+            out=io.StringIO(),
+        )
+        for workers, chunksize in ((1, 60), (2, 7))
+    ]
+    keys = ("x_win_rate", "o_win_rate", "draw_rate", "moves")
+    assert [runs[0][key] for key in keys] == [runs[1][key] for key in keys]
+
+
+SEARCH_METHODS = (
+    "bfs",
+    "a_star",
+    "dial",
+    "ida_star",
+    "jps",
+    "bidirectional_bfs",
+    "bidirectional_a_star",
+    "bitboard_bfs",
+    "nearest",
+)
+
+
+def test_walled_endpoints_are_rejected_even_when_start_is_goal():
+    maze = ["S#.", "..."]
+    for method in SEARCH_METHODS:
+        assert not getattr(lab.MazeSolver(maze, (0, 1), (0, 1)), method)().found
+        assert getattr(lab.MazeSolver(maze, (0, 2), (0, 2)), method)().path == [(0, 2)]
+    assert not lab.HierarchicalSolver(maze).solve((0, 1), (0, 1)).found
+    assert not lab.ReplanningSolver(maze, (0, 1), (0, 1)).solve().found
+    assert not lab.ReplanningSolver(maze, (0, 1), (1, 2)).solve().found
+
+
+def test_distance_field_leaves_a_walled_start_unreached():
+    pytest.importorskip("numpy")
+    dist = lab.MazeSolver(["#..", "..."], (0, 0), (1, 2)).distance_field()
+    assert (dist == -1).all()
+    dist = lab.MazeSolver(["S.#", "..."], (0, 0), (1, 2)).distance_field()
+    assert dist.tolist() == [[0, 1, -1], [1, 2, 3]]
+    solver = lab.MazeSolver(["#"], (0, 0), (0, 0))
+    assert (
+        solver.path_from_directions(solver.distance_field(directions=True)[1]) is None
+    )
+    solver = lab.MazeSolver(["."], (0, 0), (0, 0))
+    came_by = solver.distance_field(directions=True)[1]
+    assert solver.path_from_directions(came_by) == [(0, 0)]
+
+
+# two 10 x 10 halves split by a wall: each half gets landmarks, and the table stays exact in both
+def test_landmarks_cover_every_component():
+    maze = ["." * 10 + "#" + "." * 10 for _ in range(10)]
+    table = lab.LandmarkTable.build(maze, count=4, seed=0)
+    assert {landmark % 21 < 10 for landmark in table.landmarks} == {True, False}
+    for start, goal in (((0, 0), (9, 9)), ((0, 11), (9, 20))):
+        expected = lab.MazeSolver(maze, start, goal).bfs().cost
+        assert (
+            lab.MazeSolver(maze, start, goal, landmarks=table).a_star().cost == expected
+        )
+
+
+# every step of a path moves to a 4-neighbour that is open
+def assert_valid_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (row, col), (next_row, next_col) in zip(path, path[1:]):
+        assert abs(row - next_row) + abs(col - next_col) == 1
+        assert grid.cells[grid.cell_id((next_row, next_col))]
+
+
+# endpoints for the cross checks: the maze's own pair, random open pairs (some in different
+# components on the random kind) and pairs with a walled end
+def maze_queries(grid, start, goal, rng):
+    cells = [grid.cell_of(i) for i in range(grid.rows * grid.cols)]
+    open_cells = [cell for cell in cells if grid.cells[grid.cell_id(cell)]]
+    walls = [cell for cell in cells if not grid.cells[grid.cell_id(cell)]]
+    queries = [(start, goal)]
+    queries += [(rng.choice(open_cells), rng.choice(open_cells)) for _ in range(6)]
+    if walls:
+        queries += [(rng.choice(walls), goal), (start, rng.choice(walls))]
+    labels = grid.component_labels()
+    cut_off = [
+        cell
+        for cell in open_cells
+        if labels[grid.cell_id(cell)] != labels[grid.cell_id(start)]
+    ]
+    if cut_off:
+        queries.append((start, rng.choice(cut_off)))
+    return queries
+
+
+@pytest.mark.parametrize("kind", lab.BENCHMARK_KINDS)
+def test_solvers_agree_with_bfs(kind):
+    for seed in range(4):
+        rng = random.Random(seed)
+        grid, start, goal = lab.generate_maze(21, 21, kind, room_size=4, seed=seed)
+        landmarks = lab.LandmarkTable.build(grid, count=4, seed=seed)
+        hierarchy = lab.HierarchicalSolver(grid, cluster_size=5)
+        cache = lab.PathCache(grid)
+        for first, second in maze_queries(grid, start, goal, rng):
+            expected = lab.MazeSolver(grid, first, second).bfs()
+            results = [
+                getattr(lab.MazeSolver(grid, first, second), method)()
+                for method in SEARCH_METHODS
+            ]
+            results.append(
+                lab.MazeSolver(grid, first, second, landmarks=landmarks).a_star()
+            )
+            results.append(lab.ReplanningSolver(grid, first, second).solve())
+            results.append(cache.solve(first, second))
+            for result in results:
+                assert result.cost == expected.cost
+                if expected.found:
+                    assert_valid_path(grid, result.path, first, second)
+                    assert len(result.path) == expected.cost + 1
+            # the abstraction trades optimality for speed, so only its path is checked
+            result = hierarchy.solve(first, second)
+            assert result.found == expected.found
+            if expected.found:
+                assert result.cost >= expected.cost
+                assert_valid_path(grid, result.path, first, second)
+                assert len(result.path) == result.cost + 1
+
+
+# recounts from scratch everything Board keeps up to date in place and undo
+def assert_board_state(board):
+    size, win_length = board.size, board.win_length
+    stones = {
+        (row, col): board.get((row, col)) for row in range(size) for col in range(size)
+    }
+    x = sum(board.bit(cell) for cell, stone in stones.items() if stone == "X")
+    o = sum(board.bit(cell) for cell, stone in stones.items() if stone == "O")
+    assert (board.x, board.o) == (x, o)
+    assert board.moves == sum(stone != "." for stone in stones.values())
+    keys = lab.zobrist_keys(size)
+    expected_hash = 0
+    for (row, col), stone in stones.items():
+        if stone != ".":
+            expected_hash ^= keys[2 * (row * size + col) + (stone == "O")]
+    assert board.hash == expected_hash
+
+    score, won = 0, None
+    open_lines = {player: [set() for _ in range(win_length + 1)] for player in "XO"}
+    threats = {"X": set(), "O": set()}
+    for i, line in enumerate(lab.board_lines(size, win_length)):
+        line_stones = [stones[divmod(cell, size)] for cell in line]
+        x_stones, o_stones = line_stones.count("X"), line_stones.count("O")
+        assert (board.x_count[i], board.o_count[i]) == (x_stones, o_stones)
+        if x_stones == win_length:
+            won = "X"
+        if o_stones == win_length:
+            won = "O"
+        for player, own, other in (
+            ("X", x_stones, o_stones),
+            ("O", o_stones, x_stones),
+        ):
+            if own and not other:
+                open_lines[player][own].add(i)
+                score += 10**own if player == "X" else -(10**own)
+            if own == win_length - 1 and not other:
+                threats[player].add(divmod(line[line_stones.index(".")], size))
+    assert board.score == score
+    assert board.open_lines == open_lines
+    assert board.won == won
+    for player in "XO":
+        assert set(board.threats(player)) == threats[player]
+
+
+@pytest.mark.parametrize("size, win_length", ((3, 3), (5, 4), (7, 4)))
+def test_board_keeps_its_counts_through_place_and_undo(size, win_length):
+    rng = random.Random(size)
+    for _ in range(10):
+        board = lab.Board(size, win_length)
+        played = []
+        while not board.is_full() and board.won is None:
+            cell = rng.choice(board.empty_cells())
+            board.place(cell, "XO"[len(played) % 2])
+            played.append(cell)
+            assert_board_state(board)
+            # take back now and then so undo is checked mid game as well as at the end
+            if rng.random() < 0.2:
+                board.undo(played.pop())
+                assert_board_state(board)
+        while played:
+            board.undo(played.pop())
+            assert_board_state(board)
+        assert (board.x, board.o, board.hash, board.score) == (0, 0, 0, 0)
+
+
+# the workers see the grid as edited, not the neighbour tables it had before set_cell
+def test_solve_batch_sees_edits_made_before_it():
+    grid = lab.MazeGrid.from_maze(["..#..", "..#.."])
+    grid.set_cell((0, 2), True)
+    queries = [((0, 0), (0, 4))]
+    assert lab.solve_batch(grid, queries, "bfs", workers=2)[0].cost == 4
+    assert lab.solve_batch(grid, queries, "bfs", workers=1)[0].cost == 4
+
+
+# an opened wall costs its weight to enter, 1 unless given, and never enters for free
+def test_dial_prices_cells_opened_by_set_cell():
+    grid = lab.MazeGrid.from_maze([".#9", "..."])
+    grid.set_cell((0, 1), True)
+    assert lab.MazeSolver(grid, (0, 0), (0, 2)).dial().cost == 10
+    grid.set_cell((0, 1), True, weight=5)
+    assert lab.MazeSolver(grid, (0, 0), (1, 2)).dial().cost == 3
+    cache = lab.PathCache(grid, method="dial")
+    assert cache.solve((0, 0), (0, 1)).cost == 5
+    grid = lab.MazeGrid.from_maze(["...", "..."])
+    grid.set_cell((0, 1), True, weight=4)
+    assert lab.MazeSolver(grid, (0, 0), (0, 2)).dial().cost == 4
+    with pytest.raises(ValueError):
+        grid.set_cell((0, 1), True, weight=0)
+
+
+def test_benchmarks_record_every_mode():
+    records = lab.run_benchmarks(sizes=[100], memory=False, out=io.StringIO())
+    for kind in lab.BENCHMARK_KINDS:
+        runs = {r["method"]: r for r in records if r["kind"] == kind}
+        assert set(runs) == set(lab.BENCHMARK_METHODS)
+        assert runs["hierarchical"]["cost"] >= runs["bfs"]["cost"]
+        del runs["hierarchical"]
+        assert {r["cost"] for r in runs.values()} == {runs["bfs"]["cost"]}
+        assert runs["replanning"]["setup_seconds"] is not None
+
+
+# random walls opened and closed between solves, the start and goal included, each repaired
+# search matching a fresh bfs on the edited grid
+def test_replanning_repairs_its_search_after_edits():
+    for seed in range(5):
+        rng = random.Random(seed)
+        grid, start, goal = lab.generate_maze(15, 15, "random", seed=seed)
+        solver = lab.ReplanningSolver(grid, start, goal)
+        for _ in range(40):
+            for _ in range(rng.randrange(1, 4)):
+                cell = (rng.randrange(15), rng.randrange(15))
+                solver.set_cell(cell, rng.random() < 0.6)
+            result = solver.solve()
+            expected = lab.MazeSolver(grid, start, goal).bfs()
+            assert result.cost == expected.cost
+            if expected.found:
+                assert_valid_path(grid, result.path, start, goal)
+
+
+# the workers rebuild the grid from the shared block, weights included, and answer in query order
+def test_solve_batch_pool_matches_a_single_process():
+    grid, start, goal = lab.generate_maze(25, 25, "random", seed=3)
+    rng = random.Random(3)
+    open_cells = [grid.cell_of(i) for i in range(25 * 25) if grid.cells[i]]
+    queries = [(start, goal)] + [
+        (rng.choice(open_cells), rng.choice(open_cells)) for _ in range(30)
+    ]
+    weighted = [
+        "".join(str(rng.randrange(1, 10)) if c == "." else "#" for c in row)
+        for row in ["...#....", "..#..#..", "........", ".##..#.."]
+    ]
+    weighted_queries = [((0, 0), (3, 7)), ((3, 0), (0, 7)), ((1, 1), (2, 6))]
+    for maze, batch, method in (
+        (grid, queries, "a_star"),
+        (weighted, weighted_queries, "dial"),
+    ):
+        single = lab.solve_batch(maze, batch, method, workers=1)
+        pooled = lab.solve_batch(maze, batch, method, workers=2, chunksize=4)
+        assert [(r.path, r.cost) for r in pooled] == [(r.path, r.cost) for r in single]
+    assert any(r.cost != len(r.path) - 1 for r in single)
+
+
+# three corridors no path shares a cell between, in a cache holding two paths
+def test_path_cache_evicts_least_recent_and_drops_edited_grids():
+    grid = lab.MazeGrid.from_maze([".....", "#####", ".....", "#####", "....."])
+    cache = lab.PathCache(grid, method="bfs", max_size=2)
+    corridors = [((row, 0), (row, 4)) for row in (0, 2, 4)]
+    for start, goal in corridors:
+        assert cache.solve(start, goal).cost == 4
+    assert len(cache) == 2
+    # a hit makes the second corridor the most recent, so the third one goes next
+    assert cache.solve(*corridors[1]).cost == 4
+    assert cache.stats()["hits"] == 1
+    # the first corridor was evicted along with the cells its path went through
+    assert cache.solve((0, 1), (0, 3)).cost == 2
+    assert cache.stats()["misses"] == 4
+    assert cache.solve((2, 1), (2, 2)).cost == 1
+    assert cache.stats()["subpath_hits"] == 1
+    assert cache.solve((4, 1), (4, 2)).cost == 1
+    assert cache.stats()["subpath_hits"] == 1
+    assert cache.stats()["misses"] == 5
+
+    grid.set_cell((2, 2), False)
+    assert not cache.solve(*corridors[1]).found
+    assert cache.stats()["misses"] == 6
+    assert cache.stats()["version"] == grid.version
+    assert len(cache) == 1
+
+
+def test_packed_maze_round_trips_through_its_file(tmp_path):
+    path = tmp_path / "maze.pack"
+    for rows, cols in ((13, 17), (1, 1), (8, 8)):
+        grid, start, goal = lab.generate_maze(rows, cols, "random", seed=rows)
+        lab.save_packed(grid, path, start, goal)
+        loaded, loaded_start, loaded_goal = lab.load_packed(path)
+        assert (loaded.rows, loaded.cols, loaded.cells) == (rows, cols, grid.cells)
+        assert (loaded_start, loaded_goal) == (start, goal)
+    lab.save_packed(grid, path)
+    assert lab.load_packed(path)[1:] == (None, None)
+    with pytest.raises(ValueError):
+        lab.save_packed(lab.MazeGrid.from_maze([".9."]), path)
+    (tmp_path / "other.pack").write_bytes(bytes(lab.PACKED_HEADER.size))
+    with pytest.raises(ValueError):
+        lab.load_packed(tmp_path / "other.pack")
+
+
+def test_landmarks_round_trip_through_their_file(tmp_path):
+    grid, start, goal = lab.generate_maze(30, 30, "rooms", seed=4)
+    table = lab.LandmarkTable.build(grid, count=5, seed=4)
+    table.save(tmp_path / "maze.alt")
+    loaded = lab.LandmarkTable.load(grid, tmp_path / "maze.alt")
+    assert loaded.landmarks == table.landmarks
+    assert loaded.distances == table.distances
+    solver = lab.MazeSolver(grid, start, goal, landmarks=loaded)
+    assert solver.a_star().cost == lab.MazeSolver(grid, start, goal).bfs().cost
+    other, _, _ = lab.generate_maze(30, 30, "rooms", seed=5)
+    with pytest.raises(ValueError, match="different maze"):
+        lab.LandmarkTable.load(other, tmp_path / "maze.alt")
+    (tmp_path / "other.alt").write_bytes(bytes(lab.LANDMARK_HEADER.size))
+    with pytest.raises(ValueError):
+        lab.LandmarkTable.load(grid, tmp_path / "other.alt")
+
+
+def make_position(size, win_length, x_cells, o_cells):
+    board = lab.Board(size, win_length)
+    for cell in x_cells:
+        board.place(cell, "X")
+    for cell in o_cells:
+        board.place(cell, "O")
+    return board
+
+
+def test_alpha_beta_wins_blocks_and_draws_perfect_play():
+    search = lab.AlphaBetaSearch(time_ms=None)
+    # X can win at once or block O's row, and wins
+    board = make_position(3, 3, [(0, 0), (0, 1)], [(1, 0), (1, 1)])
+    assert search.choose(board, "X") == (0, 2)
+    # O has no line of its own and has to block
+    board = make_position(5, 4, [(2, 0), (2, 1), (2, 2)], [(0, 4), (4, 4)])
+    before = (board.x, board.o, board.hash, board.score)
+    assert search.choose(board, "O") == (2, 3)
+    assert (board.x, board.o, board.hash, board.score) == before
+    # perfect play on 3 x 3 is a draw
+    board = lab.Board(3, 3)
+    player = "X"
+    while board.won is None and not board.is_full():
+        board.place(search.choose(board, player), player)
+        player = "O" if player == "X" else "X"
+    assert board.won is None
+
+
+# two open cells in different components: turned down from the labels, nothing flooded
+def test_unreachable_queries_expand_nothing():
+    maze = ["..#..", "..#..", "..#.."]
+    for method in SEARCH_METHODS:
+        result = getattr(lab.MazeSolver(maze, (0, 0), (2, 4)), method)()
+        assert not result.found
+        assert result.expanded == 0